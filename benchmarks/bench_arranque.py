@@ -0,0 +1,105 @@
+"""Costo de importación al arrancar la interfaz y la línea de comandos.
+
+Importa main (la interfaz, sin abrir la ventana) y fichas.cli en
+intérpretes nuevos con python -X importtime y, para cada uno, informa la
+mediana del tiempo de importación y los módulos que más aportan. Aparte mide
+lo que tarda fichas.extraccion.precargar(), que la interfaz ejecuta en
+segundo plano una vez que la ventana está visible.
+
+    python benchmarks/bench_arranque.py [--repeticiones 5] [--maximo-ms 400]
+
+Termina con código 1 si al arrancar se importa alguna dependencia pesada
+(pdfplumber, pdfminer, Pillow, pandas, openpyxl, pyarrow, pypdfium2) o si
+la mediana supera --maximo-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que se cargan en la interfaz y en la línea de comandos al arrancar
+OBJETIVOS = ["main", "fichas.cli"]
+# Paquetes que solo deben importarse al procesar o al guardar
+PESADOS = ["pdfplumber", "pdfminer", "PIL", "pandas", "openpyxl", "pyarrow", "pypdfium2"]
+
+_PRECARGA = (
+    "import time; t = time.perf_counter(); "
+    "from fichas.extraccion import precargar; precargar(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def importtime(modulo):
+    """[(módulo, propio µs, acumulado µs, nivel)] de importar el módulo en un intérprete nuevo"""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    registros = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        registros.append((nombre.strip(), int(propio), int(acumulado), nivel))
+    return registros
+
+
+def medir(modulo, repeticiones):
+    """Milisegundos de cada importación y registros de la última que corresponden al módulo
+    (los de site y el arranque del intérprete se descartan)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        registros = importtime(modulo)
+        fin = next(i for i, (nombre, _, _, nivel) in enumerate(registros) if nombre == modulo and nivel == 0)
+        inicio = fin
+        while inicio > 0 and registros[inicio - 1][3] > 0:
+            inicio -= 1
+        registros = registros[inicio:fin + 1]
+        tiempos.append(registros[-1][2] / 1000)
+    return tiempos, registros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de importación al arrancar")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--mostrar", type=int, default=8, help="Módulos de mayor costo que se listan")
+    parser.add_argument("--maximo-ms", type=float, help="Mediana máxima aceptada por objetivo")
+    args = parser.parse_args(argv)
+
+    fallas = 0
+    for modulo in OBJETIVOS:
+        try:
+            tiempos, registros = medir(modulo, args.repeticiones)
+        except RuntimeError as e:
+            print(f"⚠️ {modulo}: no se pudo importar ({e})")
+            continue
+        mediana = statistics.median(tiempos)
+        print(f"\n🚀 import {modulo}: mediana {mediana:.1f} ms (mín {min(tiempos):.1f}, máx {max(tiempos):.1f}, "
+              f"{len(registros)} módulos)")
+        directos = sorted((r for r in registros if r[3] == 1), key=lambda r: -r[2])
+        for nombre, _, acumulado, _ in directos[:args.mostrar]:
+            print(f"   {acumulado / 1000:8.1f} ms  {nombre}")
+        pesados = sorted({nombre.split(".")[0] for nombre, *_ in registros} & set(PESADOS))
+        if pesados:
+            print(f"❌ Dependencias pesadas importadas al arrancar: {', '.join(pesados)}")
+            fallas += 1
+        if args.maximo_ms is not None and mediana > args.maximo_ms:
+            print(f"❌ La mediana supera {args.maximo_ms:.0f} ms")
+            fallas += 1
+
+    proceso = subprocess.run([sys.executable, "-c", _PRECARGA], cwd=RAIZ, capture_output=True, text=True)
+    if proceso.returncode == 0:
+        print(f"\n🔥 precargar() (en segundo plano en la interfaz): {float(proceso.stdout) * 1000:.1f} ms")
+    else:
+        print(f"\n⚠️ precargar() falló: {proceso.stderr.strip().splitlines()[-1]}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Micro-benchmark de la extracción de campos de texto.
+
+Compara extraer_campos_texto (un solo recorrido con ExtractorCampos) con la
+implementación anterior de una búsqueda re.search por campo, verifica que
+ambas produzcan las mismas columnas y muestra el costo por documento.
+
+    python benchmarks/bench_campos_texto.py [--documentos 500] [--repeticiones 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fichas.extraccion import extraer_campos_texto, formatear_cedula, formatear_fecha
+
+
+def extraer_campos_texto_anterior(texto) -> dict:
+    """Versión previa: una búsqueda independiente sobre todo el texto por campo"""
+    codigo_programa = ""
+    m = re.search(r"c[oó]digo(?:\s+del)?(?:\s+Programa)?(?:\s+o\s+EDT)?[\s:]*([0-9]{4,})", texto, re.I)
+    if m:
+        codigo_programa = m.group(1)
+
+    programas_especiales_val = ""
+    convenio_val = ""
+    m = re.search(r"Programas especiales\s*[:\-]?\s*([^\n\r]*)", texto, re.I)
+    if m:
+        val = m.group(1).strip()
+        if val and val.lower() not in ["programas especiales", "programas especiales:"]:
+            programas_especiales_val = val
+    m = re.search(r"Convenio\s*[:\-]?\s*([^\n\r]*)", texto, re.I)
+    if m:
+        val = m.group(1).strip()
+        if val and val.lower() not in ["convenio", "convenio:"]:
+            convenio_val = val
+    if (not programas_especiales_val and not convenio_val) or \
+    ((programas_especiales_val.lower() == "no aplica" if programas_especiales_val else True) and
+        (convenio_val.lower() == "no aplica" if convenio_val else True)):
+        programa_especial = "NINGUNA"
+    elif programas_especiales_val and programas_especiales_val.lower() != "no aplica":
+        programa_especial = programas_especiales_val
+    elif convenio_val and convenio_val.lower() != "no aplica":
+        programa_especial = convenio_val
+    else:
+        programa_especial = "NINGUNA"
+
+    cedula = ""
+    m = re.search(r"cedul[ao]\s*[:\-]?\s*([0-9\.,]+)", texto, re.I)
+    if m:
+        cedula = formatear_cedula(m.group(1))
+    else:
+        m2 = re.search(r"Instructor[\s\S]{0,80}?([0-9]{6,12})", texto, re.I)
+        if m2:
+            cedula = formatear_cedula(m2.group(1))
+
+    fecha_inicio_fmt = ""
+    fecha_final_fmt = ""
+    m = re.search(r"De inicio\s+(\d{1,2})\s+(\d{1,2})\s+(\d{2})", texto, re.I)
+    if m:
+        fecha_inicio_fmt = formatear_fecha(m.group(1), m.group(2), m.group(3))
+    m = re.search(r"De finalizaci[oó]n\s+(\d{1,2})\s+(\d{1,2})\s+(\d{2})", texto, re.I)
+    if m:
+        fecha_final_fmt = formatear_fecha(m.group(1), m.group(2), m.group(3))
+
+    municipio = ""
+    m = re.search(r"MUNICIPIO\s*[:\-]?\s*(.*)", texto, re.I)
+    if m:
+        municipio = m.group(1).strip()
+
+    m_lugar = re.search(r"LUGAR DONDE SE DICTA\s*[:\-]?\s*(.*)", texto, re.I)
+    m_vereda = re.search(r"VEREDA\s*[:\-]?\s*(.*)", texto, re.I)
+    lugar_val = m_lugar.group(1).strip() if m_lugar and m_lugar.group(1).strip() else ""
+    vereda_val = m_vereda.group(1).strip() if m_vereda and m_vereda.group(1).strip() else ""
+    if lugar_val and vereda_val:
+        if lugar_val.lower() == vereda_val.lower():
+            lugar_completo = lugar_val
+        else:
+            lugar_completo = f"{lugar_val} - {vereda_val}"
+    elif lugar_val:
+        lugar_completo = lugar_val
+    elif vereda_val:
+        lugar_completo = vereda_val
+    else:
+        lugar_completo = ""
+
+    cupo = ""
+    m = re.search(r"Cupo\s*[:\-]?\s*(\d+)", texto, re.I)
+    if m:
+        cupo = int(m.group(1))
+
+    return {
+        "D": codigo_programa,
+        "H": programa_especial,
+        "I": cedula,
+        "N": fecha_inicio_fmt,
+        "O": fecha_final_fmt,
+        "P": municipio,
+        "Q": lugar_completo,
+        "Z": cupo
+    }
+
+
+LINEAS_CAMPOS = [
+    lambda r: f"Código del Programa: {r.randint(100000, 999999)}",
+    lambda r: f"CODIGO o EDT {r.randint(1000, 99999)}",
+    lambda r: r.choice(["Programas especiales: NO APLICA", "Programas especiales: CAMPESENA", "Programas especiales"]),
+    lambda r: r.choice(["Convenio: NO APLICA", "Convenio: ALCALDIA MUNICIPAL", "Convenio"]),
+    lambda r: f"Cedula: {r.randint(10**6, 10**10):,}",
+    lambda r: f"Instructor asignado {r.choice(['Ana Ruiz', 'Luis Paz'])} CC {r.randint(10**6, 10**10)}",
+    lambda r: f"De inicio {r.randint(1, 28)} {r.randint(1, 12)} {r.randint(20, 26)}",
+    lambda r: f"De finalización {r.randint(1, 28)} {r.randint(1, 12)} {r.randint(20, 26)}",
+    lambda r: f"MUNICIPIO: {r.choice(['PASTO', 'IPIALES', 'TUMACO', ''])}",
+    lambda r: f"LUGAR DONDE SE DICTA: {r.choice(['Sede Centro', 'Escuela Rural', 'El Rosal'])}",
+    lambda r: f"VEREDA: {r.choice(['El Rosal', 'La Florida', ''])}",
+    lambda r: f"Cupo: {r.randint(10, 40)}",
+]
+
+
+def generar_texto(r, lineas_relleno):
+    """Texto sintético de una ficha: campos presentes o ausentes al azar y relleno"""
+    lineas = [gen(r) for gen in LINEAS_CAMPOS if r.random() > 0.15]
+    relleno = [
+        "Competencias y resultados de aprendizaje del programa de formación "
+        f"{r.randint(1, 999)} horas, ambiente {r.choice(['A', 'B', 'C'])}, numeral {r.randint(1, 99)}"
+        for _ in range(lineas_relleno)
+    ]
+    todo = lineas + relleno
+    r.shuffle(todo)
+    return "\n".join(todo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documentos", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    r = random.Random(args.semilla)
+    for nombre, relleno in (("corto (1 página)", 10), ("largo (anexos)", 400)):
+        textos = [generar_texto(r, relleno) for _ in range(args.documentos)]
+
+        diferencias = sum(
+            1 for t in textos if extraer_campos_texto(t) != extraer_campos_texto_anterior(t)
+        )
+        if diferencias:
+            print(f"❌ {nombre}: {diferencias} documentos con columnas distintas")
+            return 1
+
+        tiempos = {}
+        for etiqueta, funcion in (("anterior", extraer_campos_texto_anterior), ("actual", extraer_campos_texto)):
+            mejor = min(timeit.repeat(lambda: [funcion(t) for t in textos], number=1, repeat=args.repeticiones))
+            tiempos[etiqueta] = mejor / len(textos) * 1e6
+
+        print(
+            f"{nombre:>18}: anterior {tiempos['anterior']:8.1f} µs/doc, "
+            f"actual {tiempos['actual']:8.1f} µs/doc "
+            f"(x{tiempos['anterior'] / tiempos['actual']:.2f}), salidas idénticas"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Benchmark de extracción sobre fichas sintéticas.
+
+Genera (una sola vez por tamaño y semilla) corpus de fichas sintéticas y,
+para cada tamaño:
+
+* procesa el corpus con procesar_lote (files/s de extremo a extremo) y
+  verifica que cada fila coincida con la esperada;
+* repite el análisis de forma secuencial con la instrumentación de
+  fichas.perfil, midiendo cada etapa (abrir, texto, tablas, regex) y la
+  escritura del resultado. La primera etapa que toca una página paga
+  su interpretación con pdfminer, por lo que "texto" incluye ese costo y
+  "tablas" lo reutiliza;
+* informa qué parte de las tablas se interpretó con un diseño ya conocido
+  (ver fichas.extraccion.DisenosTabla), el pico de memoria residente del
+  proceso y cuánto lo superó cada archivo (mediana y máximo; solo donde el
+  pico se puede reiniciar, como Linux).
+
+    python benchmarks/bench_extraccion.py --archivos 10 100 1000 [--workers 4]
+
+Termina con código 1 si alguna fila difiere de la esperada o si alguna
+página se analizó más de una vez (ver DocumentoPDF.analisis_repetidos).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fichas.aislamiento import memoria_residente_mb
+from fichas.extraccion import COLUMNAS
+from fichas.lote import procesar_archivo, procesar_lote
+from fichas.perfil import ETAPAS as ETAPAS_ARCHIVO, InformePerfil
+from fichas.salida import EscritorExcel
+from fichas_sinteticas import generar_corpus
+
+ETAPAS = [*ETAPAS_ARCHIVO, "escritura"]
+
+
+def medir_etapas(rutas):
+    """Tiempo total (s) de cada etapa del análisis secuencial, páginas del corpus,
+    (tablas, tablas con diseño reutilizado), memoria sumada por archivo
+    (ver InformePerfil.memoria) y análisis de página repetidos"""
+    informe = InformePerfil()
+    filas = []
+    for ruta in rutas:
+        fila, perfil = procesar_archivo(ruta, perfilar=True)
+        informe.agregar(perfil)
+        filas.append(fila)
+
+    with tempfile.TemporaryDirectory() as temporal:
+        escritor = EscritorExcel(os.path.join(temporal, "resultado_total.xlsx"))
+        escribir = informe.envolver_escritura(escritor.escribir)
+        for fila in filas:
+            escribir(fila)
+        t0 = time.perf_counter()
+        escritor.cerrar()
+        informe.escritura += time.perf_counter() - t0
+    disenos = (
+        sum(p.tablas for p in informe.archivos),
+        sum(p.disenos_reutilizados for p in informe.archivos),
+    )
+    repetidos = sum(p.analisis_repetidos for p in informe.archivos)
+    return informe.totales(), sum(p.paginas for p in informe.archivos), disenos, informe.memoria(), repetidos
+
+
+def verificar(rutas, filas, esperado):
+    """Lista de (archivo, columnas distintas) entre lo extraído y lo esperado"""
+    diferencias = []
+    for ruta, fila in zip(rutas, filas):
+        archivo = os.path.basename(ruta)
+        distintas = [col for col in COLUMNAS if fila is None or fila[col] != esperado[archivo][col]]
+        if distintas:
+            diferencias.append((archivo, distintas))
+    return diferencias
+
+
+def ejecutar(cantidad, directorio, workers, max_paginas, semilla):
+    carpeta = os.path.join(directorio, f"corpus_{cantidad}_{semilla}")
+    esperado = generar_corpus(carpeta, cantidad, semilla)
+    rutas = [os.path.join(carpeta, archivo) for archivo in sorted(esperado)]
+
+    filas = [None] * len(rutas)
+    t0 = time.perf_counter()
+    for i, _, fila, _, _ in procesar_lote(rutas, workers, max_paginas):
+        filas[i] = fila
+    total = time.perf_counter() - t0
+
+    diferencias = verificar(rutas, filas, esperado)
+    etapas, paginas, (tablas, reutilizados), memoria_archivo, repetidos = medir_etapas(rutas)
+
+    print(f"\n📦 {cantidad} archivos ({paginas} páginas), workers={workers}"
+          + (f", max_paginas={max_paginas}" if max_paginas else ""))
+    print(f"   extremo a extremo: {total:.2f} s  →  {cantidad / total:.1f} archivos/s")
+    suma = sum(etapas.values())
+    for etapa in ETAPAS:
+        print(f"   {etapa:>10}: {etapas[etapa]:8.3f} s  ({etapas[etapa] / suma:6.1%}, "
+              f"{etapas[etapa] / cantidad * 1000:7.2f} ms/archivo)")
+    if tablas:
+        print(f"   diseños de tabla reutilizados: {reutilizados} de {tablas} ({reutilizados / tablas:.0%})")
+    # Incluye los workers del pool, ya terminados
+    memoria = memoria_residente_mb(hijos=True)
+    print(f"   pico RSS (proceso y workers): {memoria:.1f} MB" if memoria is not None else "   pico RSS: n/d")
+    if memoria_archivo:
+        mediana, maximo, mayor = memoria_archivo
+        print(f"   memoria sumada por archivo: mediana {mediana:.1f} MB, máximo {maximo:.1f} MB "
+              f"({mayor.archivo}, {mayor.paginas} páginas)")
+    if repetidos:
+        print(f"   ❌ {repetidos} análisis de página repetidos (cada página debe analizarse una sola vez)")
+    if diferencias:
+        print(f"   ❌ {len(diferencias)} archivos con columnas distintas a las esperadas:")
+        for archivo, columnas in diferencias[:10]:
+            print(f"      {archivo}: {', '.join(columnas)}")
+    else:
+        print("   ✅ todas las columnas coinciden con las esperadas")
+    return not diferencias and not repetidos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de extracción sobre fichas sintéticas")
+    parser.add_argument("--archivos", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--max-paginas",
+        type=int,
+        help="Lectura por páginas (el horario puede diferir del esperado si hay uno más amplio después)"
+    )
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument(
+        "--directorio",
+        default=os.path.join(tempfile.gettempdir(), "fichas_sinteticas"),
+        help="Dónde se generan (y reutilizan) los corpus"
+    )
+    args = parser.parse_args(argv)
+
+    correcto = True
+    for cantidad in args.archivos:
+        correcto &= ejecutar(cantidad, args.directorio, args.workers, args.max_paginas, args.semilla)
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
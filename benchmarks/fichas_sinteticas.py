@@ -0,0 +1,227 @@
+"""Generador de fichas de caracterización sintéticas para benchmarks.
+
+Escribe PDFs mínimos (texto en Helvetica y tablas con bordes) sin
+dependencias externas y devuelve, para cada archivo, la fila D..Z que el
+extractor debe producir. Las fichas varían en número de páginas (anexos),
+en la forma de la tabla de horario (DESDE/HASTA o fila HORARIO), en la
+página donde está el horario y en los campos que faltan.
+"""
+import json
+import os
+import random
+
+MUNICIPIOS = ["PASTO", "IPIALES", "TUMACO", "LA UNION", "SANDONA", "TUQUERRES"]
+LUGARES = ["Sede Centro", "Institucion Educativa San Jose", "Escuela Rural Mixta", "Casa de la Cultura"]
+VEREDAS = ["El Rosal", "La Florida", "San Felipe", "Sede Centro"]
+PROGRAMAS = ["CAMPESENA", "FULL POPULAR", "SENA EMPRENDE RURAL"]
+CONVENIOS = ["ALCALDIA MUNICIPAL", "GOBERNACION DE NARIÑO"]
+INSTRUCTORES = ["Ana Ruiz", "Luis Paz", "Marta Erazo", "Jorge Bravo"]
+DIAS = ["LU", "MA", "MI", "JU", "VI", "SA", "DO"]
+COLUMNAS_DIAS = ["S", "T", "U", "V", "W", "X", "Y"]
+
+ALTO_PAGINA = 792
+NOMBRE_ESPERADO = "esperado.json"
+
+
+# =========================
+# Escritura de PDF
+# =========================
+
+def _escapar(texto):
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _texto(x, y, texto, tamano=9):
+    return f"BT /F1 {tamano} Tf {x} {y} Td ({_escapar(texto)}) Tj ET\n"
+
+
+def _tabla(x, y, anchos, filas, alto=16):
+    """Tabla con bordes completos (pdfplumber la detecta por sus líneas)"""
+    contenido = ""
+    ancho_total = sum(anchos)
+    for r in range(len(filas) + 1):
+        contenido += f"{x} {y - r * alto} m {x + ancho_total} {y - r * alto} l S\n"
+    cx = x
+    for ancho in anchos + [0]:
+        contenido += f"{cx} {y} m {cx} {y - len(filas) * alto} l S\n"
+        cx += ancho
+    for r, fila in enumerate(filas):
+        cx = x
+        for ancho, celda in zip(anchos, fila):
+            if celda:
+                contenido += _texto(cx + 3, y - r * alto - 12, celda)
+            cx += ancho
+    return contenido
+
+
+def pdf_bytes(paginas):
+    """PDF con una página por flujo de contenido"""
+    objetos = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    hijos = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(paginas)))
+    objetos.append(f"<< /Type /Pages /Kids [{hijos}] /Count {len(paginas)} >>".encode())
+    id_fuente = 3 + 2 * len(paginas)
+    for i, contenido in enumerate(paginas):
+        datos = contenido.encode("cp1252")
+        objetos.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 {ALTO_PAGINA}] "
+            f"/Resources << /Font << /F1 {id_fuente} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        ).encode())
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(datos) + datos + b"\nendstream")
+    objetos.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    salida = bytearray(b"%PDF-1.4\n")
+    posiciones = []
+    for i, objeto in enumerate(objetos):
+        posiciones.append(len(salida))
+        salida += f"{i + 1} 0 obj\n".encode() + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for posicion in posiciones:
+        salida += f"{posicion:010d} 00000 n \n".encode()
+    salida += (
+        f"trailer << /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n"
+    ).encode()
+    return bytes(salida)
+
+
+# =========================
+# Contenido de las fichas
+# =========================
+
+def _formatear_cedula(numero):
+    return f"{numero:,}".replace(",", ".")
+
+
+def generar_ficha(r):
+    """Contenido de páginas y fila esperada de una ficha aleatoria"""
+    esperado = {col: "" for col in ["D", "H", "I", "N", "O", "P", "Q", "R", *COLUMNAS_DIAS, "Z"]}
+    lineas = ["FICHA DE CARACTERIZACION", "Regional Nariño - Centro Internacional de Produccion Limpia"]
+
+    def falta(probabilidad=0.1):
+        return r.random() < probabilidad
+
+    if not falta():
+        codigo = str(r.randint(100000, 999999))
+        lineas.append(f"Código del Programa: {codigo}")
+        esperado["D"] = codigo
+
+    especial = r.choice(["NO APLICA", "NO APLICA"] + PROGRAMAS)
+    convenio = r.choice(["NO APLICA", "NO APLICA"] + CONVENIOS)
+    lineas.append(f"Programas especiales: {especial}")
+    lineas.append(f"Convenio: {convenio}")
+    if especial != "NO APLICA":
+        esperado["H"] = especial
+    elif convenio != "NO APLICA":
+        esperado["H"] = convenio
+    else:
+        esperado["H"] = "NINGUNA"
+
+    cedula = r.randint(10 ** 6, 10 ** 10 - 1)
+    if r.random() < 0.7:
+        lineas.append(f"Cedula: {_formatear_cedula(cedula)}")
+        esperado["I"] = _formatear_cedula(cedula)
+    elif not falta(0.3):
+        lineas.append(f"Instructor asignado: {r.choice(INSTRUCTORES)} CC {cedula}")
+        esperado["I"] = _formatear_cedula(cedula)
+
+    for etiqueta, columna in (("De inicio", "N"), ("De finalización", "O")):
+        if falta():
+            continue
+        dia, mes, anio = r.randint(1, 28), r.randint(1, 12), r.randint(20, 26)
+        lineas.append(f"{etiqueta} {dia:02d} {mes:02d} {anio}")
+        esperado[columna] = f"{dia}/{mes}/20{anio}"
+
+    if not falta():
+        municipio = r.choice(MUNICIPIOS)
+        lineas.append(f"MUNICIPIO: {municipio}")
+        esperado["P"] = municipio
+
+    lugar = r.choice(LUGARES) if not falta(0.2) else ""
+    vereda = r.choice(VEREDAS) if not falta(0.3) else ""
+    if lugar:
+        lineas.append(f"LUGAR DONDE SE DICTA: {lugar}")
+    if vereda:
+        lineas.append(f"VEREDA: {vereda}")
+    if lugar and vereda:
+        esperado["Q"] = lugar if lugar.lower() == vereda.lower() else f"{lugar} - {vereda}"
+    else:
+        esperado["Q"] = lugar or vereda
+
+    if not falta():
+        cupo = r.randint(10, 40)
+        lineas.append(f"Cupo: {cupo}")
+        esperado["Z"] = cupo
+
+    y = ALTO_PAGINA - 40
+    primera = ""
+    for linea in lineas:
+        primera += _texto(50, y, linea)
+        y -= 14
+    paginas = [primera]
+
+    # Horario: tabla DESDE/HASTA o fila HORARIO, en la primera o segunda página
+    tablas = []
+    if not falta():
+        rangos = r.sample(range(2, 11), r.randint(1, 3))
+        inicios = [r.randint(6, 13) for _ in rangos]
+        horarios = [(inicio, inicio + rango) for inicio, rango in zip(inicios, rangos)]
+        if r.random() < 0.6:
+            filas = [["JORNADA", "DESDE", "HASTA"]]
+            filas += [[f"J{i + 1}", f"{d}:00", f"{h}:00"] for i, (d, h) in enumerate(horarios)]
+            tablas.append(([90, 80, 80], filas))
+        else:
+            filas = [["HORARIO", str(d), str(h)] for d, h in horarios]
+            tablas.append(([120, 60, 60], filas))
+        desde, hasta = max(horarios, key=lambda par: par[1] - par[0])
+        esperado["R"] = f"{desde} A {hasta}"
+
+    if not falta():
+        horas = [str(r.randint(2, 8)) if r.random() < 0.5 else "" for _ in DIAS]
+        tablas.append(([40] * 7, [DIAS, horas]))
+        for col, valor in zip(COLUMNAS_DIAS, horas):
+            esperado[col] = "X" if valor else ""
+
+    if tablas and r.random() < 0.3:
+        paginas.append(_texto(50, ALTO_PAGINA - 40, "Programacion de la formacion"))
+        y = ALTO_PAGINA - 80
+    else:
+        y -= 30
+    for anchos, filas in tablas:
+        paginas[-1] += _tabla(50, y, anchos, filas)
+        y -= 16 * len(filas) + 40
+
+    # Anexos: texto y tablas que no son de horario
+    for n in range(r.choice([0, 0, 0, 1, 2, 5, 10])):
+        anexo = _texto(50, ALTO_PAGINA - 40, f"ANEXO {n + 1} - Resultados de aprendizaje")
+        for i in range(30):
+            anexo += _texto(50, ALTO_PAGINA - 60 - 14 * i,
+                            f"{i + 1}. Aplicar procedimientos tecnicos segun la normativa vigente ({r.randint(10, 99)} horas)")
+        filas = [["COMPETENCIA", "RESULTADO", "HORAS"]]
+        filas += [[f"C{i}", f"R{i}", str(r.randint(10, 99))] for i in range(6)]
+        anexo += _tabla(50, 300, [150, 150, 150], filas)
+        paginas.append(anexo)
+
+    return paginas, esperado
+
+
+def generar_corpus(carpeta, cantidad, semilla=1234):
+    """Escribir cantidad fichas en la carpeta; devuelve {archivo: fila esperada}"""
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_esperado = os.path.join(carpeta, NOMBRE_ESPERADO)
+    if os.path.exists(ruta_esperado):
+        with open(ruta_esperado, encoding="utf-8") as f:
+            esperado = json.load(f)
+        if len(esperado) == cantidad:
+            return esperado
+
+    r = random.Random(semilla)
+    esperado = {}
+    for i in range(cantidad):
+        paginas, fila = generar_ficha(r)
+        archivo = f"ficha_{i:05d}.pdf"
+        with open(os.path.join(carpeta, archivo), "wb") as f:
+            f.write(pdf_bytes(paginas))
+        esperado[archivo] = fila
+    with open(ruta_esperado, "w", encoding="utf-8") as f:
+        json.dump(esperado, f, ensure_ascii=False)
+    return esperado
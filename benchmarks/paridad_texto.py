@@ -0,0 +1,103 @@
+"""Paridad y costo de los motores de texto (fichas.texto) frente a pdfplumber.
+
+Procesa el corpus con cada motor y compara todas las columnas D..Z con las
+que produce pdfplumber (el motor por defecto). Sin --carpeta usa un corpus
+de fichas sintéticas; con --carpeta, las fichas reales de esa carpeta.
+
+    python benchmarks/paridad_texto.py [--carpeta fichas/] [--motores pdfium pdfminer] [--workers 4]
+
+Termina con código 1 si algún motor produce una columna distinta (o falla
+en un archivo que pdfplumber procesa).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fichas.descubrimiento import listar_pdfs
+from fichas.extraccion import COLUMNAS
+from fichas.lote import procesar_lote
+from fichas.texto import MOTOR_POR_DEFECTO, MOTORES_TEXTO, verificar_motor_texto
+from fichas_sinteticas import generar_corpus
+
+
+def procesar(rutas, workers, motor):
+    """Filas (o None si hubo error) y segundos totales con el motor indicado"""
+    filas = [None] * len(rutas)
+    t0 = time.perf_counter()
+    for i, _, fila, _, _ in procesar_lote(rutas, workers, motor_texto=motor):
+        filas[i] = fila
+    return filas, time.perf_counter() - t0
+
+
+def comparar(rutas, filas, referencia):
+    """Lista de (archivo, columnas distintas) entre las filas y las de referencia"""
+    diferencias = []
+    for ruta, fila, esperada in zip(rutas, filas, referencia):
+        if fila is None and esperada is None:
+            continue
+        if fila is None or esperada is None:
+            distintas = ["error"]
+        else:
+            distintas = [col for col in COLUMNAS if fila[col] != esperada[col]]
+        if distintas:
+            diferencias.append((os.path.relpath(ruta, os.path.dirname(rutas[0])), distintas))
+    return diferencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paridad de los motores de texto frente a pdfplumber")
+    parser.add_argument("--carpeta", help="Carpeta con fichas reales (se recorren las subcarpetas)")
+    parser.add_argument("--archivos", type=int, default=200, help="Tamaño del corpus sintético")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument(
+        "--directorio",
+        default=os.path.join(tempfile.gettempdir(), "fichas_sinteticas"),
+        help="Dónde se genera (y reutiliza) el corpus sintético"
+    )
+    parser.add_argument("--motores", nargs="+", choices=sorted(MOTORES_TEXTO), default=sorted(MOTORES_TEXTO))
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.carpeta:
+        carpeta = args.carpeta
+        rutas = [os.path.join(carpeta, archivo) for archivo in listar_pdfs(carpeta, recursivo=True)]
+    else:
+        carpeta = os.path.join(args.directorio, f"corpus_{args.archivos}_{args.semilla}")
+        esperado = generar_corpus(carpeta, args.archivos, args.semilla)
+        rutas = [os.path.join(carpeta, archivo) for archivo in sorted(esperado)]
+    if not rutas:
+        print(f"❌ No hay PDFs en {carpeta}")
+        return 2
+
+    referencia, segundos = procesar(rutas, args.workers, MOTOR_POR_DEFECTO)
+    print(f"\n📦 {len(rutas)} archivos de {carpeta}, workers={args.workers}")
+    print(f"   {MOTOR_POR_DEFECTO:>10}: {segundos:8.2f} s  ({segundos / len(rutas) * 1000:7.2f} ms/archivo)")
+
+    correcto = True
+    for motor in args.motores:
+        try:
+            verificar_motor_texto(motor)
+        except ImportError as e:
+            print(f"   {motor:>10}: ⚠️ {str(e)}")
+            continue
+        filas, tiempo = procesar(rutas, args.workers, motor)
+        diferencias = comparar(rutas, filas, referencia)
+        print(f"   {motor:>10}: {tiempo:8.2f} s  ({tiempo / len(rutas) * 1000:7.2f} ms/archivo, "
+              f"x{segundos / tiempo:.2f})")
+        if diferencias:
+            correcto = False
+            print(f"      ❌ {len(diferencias)} archivos con columnas distintas a {MOTOR_POR_DEFECTO}:")
+            for archivo, columnas in diferencias[:10]:
+                print(f"         {archivo}: {', '.join(columnas)}")
+        else:
+            print(f"      ✅ todas las columnas D..Z coinciden con {MOTOR_POR_DEFECTO}")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
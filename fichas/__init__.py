@@ -0,0 +1,26 @@
+"""Extracción de datos de fichas de caracterización SENA sin interfaz gráfica.
+
+Uso desde la línea de comandos::
+
+    python -m fichas extraer <carpeta> -o resultado_total.xlsx --workers 4
+    python -m fichas extraer <carpeta> --recursivo --vigilar 60
+    python -m fichas extraer <carpeta> --fragmento 2/8   # en cada equipo, k = 1..8
+    python -m fichas unir <carpeta>
+"""
+from .extraccion import DocumentoPDF, FilaFicha, procesar_pdf
+from .descubrimiento import VigilanteCarpeta, listar_pdfs, recorrer_pdfs
+from .fragmentos import unir_fragmentos
+from .lote import ejecutar_lote, procesar_lote, vigilar_lote
+
+__all__ = [
+    "DocumentoPDF",
+    "FilaFicha",
+    "procesar_pdf",
+    "VigilanteCarpeta",
+    "listar_pdfs",
+    "recorrer_pdfs",
+    "unir_fragmentos",
+    "ejecutar_lote",
+    "procesar_lote",
+    "vigilar_lote",
+]
@@ -0,0 +1,234 @@
+"""Ejecución aislada de archivos con límite de tiempo y memoria, y lista de cuarentena.
+
+Cada PDF se procesa en su propio proceso. Si supera el tiempo máximo, o
+su memoria residente crece más que el límite, el proceso se termina y el archivo
+se informa con LimiteExcedido. Los archivos que excedieron un límite se
+anotan en la cuarentena de la carpeta para que las siguientes ejecuciones
+los omitan (o los reintenten aparte) sin detener el resto del lote.
+"""
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from multiprocessing.connection import wait
+
+from .perfil import pico_memoria_mb, reiniciar_pico_memoria
+
+NOMBRE_CUARENTENA = "resultado_total.cuarentena.json"
+
+# Valores por defecto del modo aislado
+LIMITE_SEGUNDOS = 300
+LIMITE_MEMORIA_MB = 2048
+
+# Código de salida del proceso hijo cuando supera la memoria permitida
+_CODIGO_MEMORIA = 86
+_INTERVALO_MEMORIA = 0.1
+
+
+class LimiteExcedido(Exception):
+    """El archivo superó el tiempo o la memoria permitidos y su proceso fue terminado"""
+
+
+def memoria_residente_mb(hijos=False):
+    """Pico de memoria residente del proceso actual (MB); None si no se puede medir.
+
+    Con hijos, el mayor entre el del proceso y el de sus hijos ya terminados.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if hijos:
+        pico = max(pico, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def memoria_medible():
+    """Si el límite de memoria se puede aplicar en esta plataforma"""
+    return memoria_residente_mb() is not None
+
+
+def _medidor_memoria():
+    """(función que mide el pico de memoria del proceso en MB, valor inicial).
+
+    Un hijo creado con fork empieza con las páginas residentes del padre (y
+    su pico): el límite se aplica a lo que crece el hijo desde este punto,
+    para que un padre grande (p. ej. con la planilla maestra cargada) no
+    mande a cuarentena archivos normales. Donde se puede (Linux) el pico se
+    reinicia antes de tomar la base.
+    """
+    medir = memoria_residente_mb
+    if reiniciar_pico_memoria() and pico_memoria_mb() is not None:
+        medir = pico_memoria_mb
+    return medir, medir()
+
+
+def _vigilar_memoria(limite_mb, medir, inicial):
+    while True:
+        memoria = medir()
+        if memoria is not None and memoria - inicial > limite_mb:
+            os._exit(_CODIGO_MEMORIA)
+        time.sleep(_INTERVALO_MEMORIA)
+
+
+def _ejecutar_hijo(conexion, procesar, ruta, limite_memoria_mb):
+    """Cuerpo del proceso aislado: envía ("ok", resultado) o ("error", mensaje)"""
+    if limite_memoria_mb and memoria_medible():
+        # La base se toma antes de empezar a procesar
+        medir, inicial = _medidor_memoria()
+        threading.Thread(target=_vigilar_memoria, args=(limite_memoria_mb, medir, inicial), daemon=True).start()
+    try:
+        conexion.send(("ok", procesar(ruta)))
+    except MemoryError:
+        os._exit(_CODIGO_MEMORIA)
+    except Exception as e:
+        conexion.send(("error", str(e) or type(e).__name__))
+    finally:
+        conexion.close()
+
+
+def _terminar(proceso):
+    proceso.terminate()
+    proceso.join(1)
+    if proceso.is_alive():
+        proceso.kill()
+        proceso.join()
+
+
+def procesar_aislado(procesar, rutas_pdf, workers=1, limite_segundos=None, limite_memoria_mb=None):
+    """Ejecutar procesar(ruta) en un proceso por archivo, con hasta workers a la vez.
+
+    Entrega (indice, ruta, resultado, error) a medida que terminan. Los
+    archivos que superan limite_segundos o limite_memoria_mb (o cuyo proceso
+    muere) llegan con un LimiteExcedido; los errores normales de procesar
+    llegan como Exception con su mensaje.
+    """
+    contexto = multiprocessing.get_context()
+    siguientes = iter(enumerate(rutas_pdf))
+    activos = {}  # conexión -> (indice, ruta, proceso, vencimiento)
+
+    def lanzar():
+        for i, ruta in siguientes:
+            receptor, emisor = contexto.Pipe(duplex=False)
+            proceso = contexto.Process(
+                target=_ejecutar_hijo,
+                args=(emisor, procesar, ruta, limite_memoria_mb),
+                daemon=True
+            )
+            proceso.start()
+            emisor.close()
+            vencimiento = time.monotonic() + limite_segundos if limite_segundos else None
+            activos[receptor] = (i, ruta, proceso, vencimiento)
+            if len(activos) >= max(1, workers):
+                return
+
+    try:
+        lanzar()
+        while activos:
+            vencimientos = [v for _, _, _, v in activos.values() if v is not None]
+            espera = max(0.0, min(vencimientos) - time.monotonic()) if vencimientos else None
+            listos = wait(list(activos), timeout=espera)
+
+            for receptor in listos:
+                i, ruta, proceso, _ = activos.pop(receptor)
+                try:
+                    estado, valor = receptor.recv()
+                except EOFError:
+                    estado, valor = None, None
+                receptor.close()
+                proceso.join()
+                if estado == "ok":
+                    yield i, ruta, valor, None
+                elif estado == "error":
+                    yield i, ruta, None, Exception(valor)
+                elif proceso.exitcode == _CODIGO_MEMORIA:
+                    yield i, ruta, None, LimiteExcedido(f"superó el límite de memoria ({limite_memoria_mb} MB)")
+                else:
+                    yield i, ruta, None, LimiteExcedido(
+                        f"el proceso terminó inesperadamente (código {proceso.exitcode})"
+                    )
+
+            ahora = time.monotonic()
+            for receptor, (i, ruta, proceso, vencimiento) in list(activos.items()):
+                if vencimiento is not None and ahora >= vencimiento:
+                    del activos[receptor]
+                    _terminar(proceso)
+                    receptor.close()
+                    yield i, ruta, None, LimiteExcedido(f"superó el tiempo máximo ({limite_segundos} s)")
+
+            lanzar()
+    finally:
+        for receptor, (_, _, proceso, _) in activos.items():
+            _terminar(proceso)
+            receptor.close()
+
+
+class Cuarentena:
+    """Archivos que excedieron un límite, guardados en JSON junto a los PDFs.
+
+    Una entrada solo aplica mientras el archivo conserve el tamaño y la
+    fecha de modificación con que se registró; si cambia, se vuelve a procesar.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.entradas = {}
+        self._cambios = False
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                self.entradas = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _firma(ruta_pdf):
+        estado = os.stat(ruta_pdf)
+        return estado.st_size, estado.st_mtime_ns
+
+    def motivo(self, archivo, ruta_pdf):
+        """Motivo de la cuarentena del archivo; None si no está (o cambió desde entonces)"""
+        entrada = self.entradas.get(archivo)
+        if entrada is None:
+            return None
+        try:
+            tamano, mtime = self._firma(ruta_pdf)
+        except OSError:
+            return None
+        if entrada.get("tamano") != tamano or entrada.get("mtime") != mtime:
+            return None
+        return entrada.get("motivo", "")
+
+    def agregar(self, archivo, ruta_pdf, motivo):
+        try:
+            tamano, mtime = self._firma(ruta_pdf)
+        except OSError:
+            return
+        self.entradas[archivo] = {
+            "tamano": tamano,
+            "mtime": mtime,
+            "motivo": motivo,
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._cambios = True
+
+    def quitar(self, archivo):
+        if self.entradas.pop(archivo, None) is not None:
+            self._cambios = True
+
+    def guardar(self):
+        """Escribir la lista si cambió; si quedó vacía se elimina el archivo"""
+        if not self._cambios:
+            return
+        if not self.entradas:
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
+        else:
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.ruta)
+        self._cambios = False
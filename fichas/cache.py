@@ -0,0 +1,143 @@
+"""Caché persistente (SQLite) de filas extraídas para no reprocesar fichas sin cambios.
+
+Cada fila se guarda con el tamaño, la fecha de modificación y el hash del
+contenido del PDF, además de la versión del extractor. Un archivo cuyo
+tamaño y mtime no cambiaron se resuelve sin leerlo; si cambiaron, se
+calcula el hash y se busca por contenido (copias o archivos renombrados).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .extraccion import VERSION_EXTRACTOR, FilaFicha
+
+NOMBRE_CACHE = "resultado_total.cache.sqlite"
+
+# Versión del esquema de la tabla; si cambia se descarta la caché anterior
+ESQUEMA = 2
+
+# Política de desalojo
+DIAS_MAXIMOS = 90
+MAX_ENTRADAS = 100000
+
+
+def hash_archivo(ruta, bloque=1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """Filas extraídas indexadas por archivo (clave) y por hash de contenido"""
+
+    def __init__(self, ruta_db, variante="", dias_maximos=DIAS_MAXIMOS, max_entradas=MAX_ENTRADAS):
+        self.ruta_db = ruta_db
+        # La variante separa filas obtenidas con otras opciones de extracción
+        self.version = f"{VERSION_EXTRACTOR}/{variante}" if variante else VERSION_EXTRACTOR
+        self.dias_maximos = dias_maximos
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._firmas = {}
+        self._sin_confirmar = 0
+        self.conn = sqlite3.connect(ruta_db)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != ESQUEMA:
+            self.conn.execute("DROP TABLE IF EXISTS filas")
+            self.conn.execute(f"PRAGMA user_version = {ESQUEMA}")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS filas ("
+            " clave TEXT NOT NULL,"
+            " tamano INTEGER NOT NULL,"
+            " mtime INTEGER NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " fila TEXT NOT NULL,"
+            " usado REAL NOT NULL,"
+            " PRIMARY KEY (clave, version))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_filas_hash ON filas (hash, tamano)")
+        self.desalojar()
+
+    def desalojar(self):
+        """Eliminar entradas de otra versión del extractor, sin uso en
+        dias_maximos días o que excedan max_entradas (las menos usadas)"""
+        limite = time.time() - self.dias_maximos * 86400
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM filas WHERE version != ? AND version NOT LIKE ?",
+                (VERSION_EXTRACTOR, VERSION_EXTRACTOR + "/%")
+            )
+            self.conn.execute("DELETE FROM filas WHERE usado < ?", (limite,))
+            self.conn.execute(
+                "DELETE FROM filas WHERE rowid NOT IN "
+                "(SELECT rowid FROM filas ORDER BY usado DESC LIMIT ?)",
+                (self.max_entradas,)
+            )
+
+    def buscar(self, clave, ruta):
+        """Fila guardada para el archivo, o None si hay que procesarlo"""
+        st = os.stat(ruta)
+        ahora = time.time()
+        registro = self.conn.execute(
+            "SELECT tamano, mtime, fila FROM filas WHERE clave = ? AND version = ?",
+            (clave, self.version)
+        ).fetchone()
+        if registro and registro[0] == st.st_size and registro[1] == st.st_mtime_ns:
+            self.conn.execute(
+                "UPDATE filas SET usado = ? WHERE clave = ? AND version = ?",
+                (ahora, clave, self.version)
+            )
+            self._confirmar()
+            self.aciertos += 1
+            return FilaFicha.desde_dict(json.loads(registro[2]))
+
+        # Tamaño o fecha distintos: decidir por el contenido
+        digest = hash_archivo(ruta)
+        registro = self.conn.execute(
+            "SELECT fila FROM filas WHERE hash = ? AND tamano = ? AND version = ? LIMIT 1",
+            (digest, st.st_size, self.version)
+        ).fetchone()
+        if registro:
+            self._escribir(clave, st, digest, registro[0])
+            self.aciertos += 1
+            return FilaFicha.desde_dict(json.loads(registro[0]))
+
+        self._firmas[clave] = (st, digest)
+        self.fallos += 1
+        return None
+
+    def hash_pendiente(self, clave):
+        """Hash calculado por buscar para un archivo aún no guardado; None si no se calculó"""
+        return self._firmas.get(clave, (None, None))[1]
+
+    def guardar(self, clave, ruta, fila):
+        """Registrar la fila recién extraída de un archivo"""
+        st, digest = self._firmas.pop(clave, (None, None))
+        if st is None:
+            st, digest = os.stat(ruta), hash_archivo(ruta)
+        datos = fila.como_dict()
+        if fila.alternativos:
+            datos["alternativos"] = list(fila.alternativos)
+        self._escribir(clave, st, digest, json.dumps(datos, ensure_ascii=False))
+
+    def _escribir(self, clave, st, digest, fila_json):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO filas (clave, tamano, mtime, hash, version, fila, usado) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (clave, st.st_size, st.st_mtime_ns, digest, self.version, fila_json, time.time())
+        )
+        self._confirmar()
+
+    def _confirmar(self, cada=100):
+        self._sin_confirmar += 1
+        if self._sin_confirmar >= cada:
+            self.conn.commit()
+            self._sin_confirmar = 0
+
+    def cerrar(self):
+        self.conn.commit()
+        self.conn.close()
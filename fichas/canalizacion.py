@@ -0,0 +1,183 @@
+"""Procesamiento en etapas: lectura anticipada, análisis y escritura a la vez.
+
+Sin precarga cada worker lee su PDF del disco (a menudo una carpeta de red)
+justo antes de analizarlo, y mientras tanto la CPU espera. Con
+procesar_canalizado unos hilos de lectura cargan en memoria los bytes de
+los siguientes archivos mientras se analizan los anteriores; el análisis
+recibe esos bytes (pdfplumber los abre como un flujo en memoria) y el hilo
+principal, que recibe los resultados y escribe las filas, trabaja a la vez
+que los procesos de análisis.
+
+La cantidad de archivos en vuelo (leyéndose, leídos o analizándose) está
+acotada, de modo que la memoria no depende del tamaño de la carpeta.
+EstadisticasCanal registra la profundidad de la cola de lectura y el tiempo
+que cada etapa pasó detenida esperando a la anterior.
+"""
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+# Valores por defecto: archivos leídos por adelantado e hilos de lectura
+PRECARGA = 8
+HILOS_LECTURA = 2
+
+
+def leer_pdf(ruta):
+    """Bytes del PDF y segundos que tomó leerlo"""
+    inicio = time.perf_counter()
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    return datos, time.perf_counter() - inicio
+
+
+class EstadisticasCanal:
+    """Tiempos de espera y profundidad de las colas de procesar_canalizado"""
+
+    def __init__(self, precarga=PRECARGA, hilos_lectura=HILOS_LECTURA):
+        self.precarga = precarga
+        self.hilos_lectura = hilos_lectura
+        self.archivos = 0
+        self.bytes = 0
+        # Suma de los tiempos de lectura de todos los hilos
+        self.lectura = 0.0
+        # Análisis detenido sin archivos leídos (con varios workers, en segundos-worker)
+        self.espera_lectura = 0.0
+        # Hilo principal (escritura) esperando resultados del análisis; None
+        # con un solo worker, donde el mismo hilo analiza y escribe
+        self.espera_analisis = 0.0
+        self._muestras = 0
+        self._suma_cola = 0
+        self.cola_maxima = 0
+        self.cola_llena = 0
+
+    def leido(self, datos, segundos):
+        self.archivos += 1
+        self.bytes += len(datos)
+        self.lectura += segundos
+
+    def muestrear(self, cola):
+        """Registrar cuántos archivos leídos esperan al análisis"""
+        self._muestras += 1
+        self._suma_cola += cola
+        self.cola_maxima = max(self.cola_maxima, cola)
+        if cola >= self.precarga:
+            self.cola_llena += 1
+
+    def resumen(self):
+        """Líneas para el registro de actividad"""
+        if not self.archivos:
+            return []
+        media = self._suma_cola / self._muestras if self._muestras else 0.0
+        llena = self.cola_llena / self._muestras if self._muestras else 0.0
+        if self.espera_analisis is None:
+            escritura = "escritura esperando análisis: no aplica (un solo worker)"
+        else:
+            escritura = f"escritura esperando análisis: {self.espera_analisis:.2f} s"
+        return [
+            f"🚰 Lectura anticipada ({self.precarga} archivos, {self.hilos_lectura} hilos): "
+            f"{self.archivos} archivos, {self.bytes / 1e6:.1f} MB leídos en {self.lectura:.2f} s",
+            f"   análisis esperando lectura: {self.espera_lectura:.2f} s; {escritura}",
+            f"   cola de lectura: media {media:.1f}, máximo {self.cola_maxima} de {self.precarga} "
+            f"(llena en {llena:.0%} de los archivos)",
+        ]
+
+
+def procesar_canalizado(procesar, rutas_pdf, workers=1, precarga=PRECARGA, hilos_lectura=HILOS_LECTURA,
+                        estadisticas=None):
+    """Ejecutar procesar(ruta, datos=bytes) con lectura anticipada, entregando
+    (indice, ruta, resultado, error) a medida que terminan.
+
+    rutas_pdf se recorre solo desde el hilo que consume el generador, a medida
+    que hay lugar: hasta precarga archivos leídos por adelantado (más los
+    workers en análisis). Los errores de lectura llegan como el error del
+    archivo, igual que si hubiera fallado al abrirlo.
+    """
+    estadisticas = estadisticas or EstadisticasCanal(precarga, hilos_lectura)
+    entradas = iter(enumerate(rutas_pdf))
+    with ThreadPoolExecutor(max_workers=max(1, hilos_lectura), thread_name_prefix="lectura") as lectores:
+        if workers <= 1:
+            yield from _secuencial(procesar, entradas, lectores, precarga, estadisticas)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                yield from _paralelo(procesar, entradas, lectores, pool, workers, precarga, estadisticas)
+
+
+def _secuencial(procesar, entradas, lectores, precarga, estadisticas):
+    lecturas = deque()  # (indice, ruta, futuro) en orden
+    estadisticas.espera_analisis = None
+
+    def llenar():
+        while len(lecturas) < max(1, precarga):
+            siguiente = next(entradas, None)
+            if siguiente is None:
+                return
+            i, ruta = siguiente
+            lecturas.append((i, ruta, lectores.submit(leer_pdf, ruta)))
+
+    llenar()
+    while lecturas:
+        i, ruta, futuro = lecturas.popleft()
+        estadisticas.muestrear(futuro.done() + sum(f.done() for _, _, f in lecturas))
+        inicio = time.perf_counter()
+        try:
+            datos, segundos = futuro.result()
+        except Exception as e:
+            yield i, ruta, None, e
+            llenar()
+            continue
+        finally:
+            estadisticas.espera_lectura += time.perf_counter() - inicio
+        estadisticas.leido(datos, segundos)
+        # Reponer antes de analizar: la lectura avanza durante el análisis
+        llenar()
+        try:
+            resultado = procesar(ruta, datos=datos)
+        except Exception as e:
+            yield i, ruta, None, e
+        else:
+            yield i, ruta, resultado, None
+
+
+def _paralelo(procesar, entradas, lectores, pool, workers, precarga, estadisticas):
+    leyendo = {}  # futuro de lectura -> (indice, ruta)
+    analizando = {}  # futuro de análisis -> (indice, ruta)
+
+    def llenar():
+        while len(leyendo) + len(analizando) < max(1, precarga) + workers:
+            siguiente = next(entradas, None)
+            if siguiente is None:
+                return
+            i, ruta = siguiente
+            leyendo[lectores.submit(leer_pdf, ruta)] = (i, ruta)
+
+    llenar()
+    while leyendo or analizando:
+        ocupados = min(len(analizando), workers)
+        estadisticas.muestrear(max(0, len(analizando) - workers))
+        inicio = time.perf_counter()
+        listos, _ = wait([*leyendo, *analizando], return_when=FIRST_COMPLETED)
+        espera = time.perf_counter() - inicio
+        if analizando:
+            estadisticas.espera_analisis += espera
+        if leyendo and ocupados < workers:
+            estadisticas.espera_lectura += espera * (workers - ocupados)
+
+        for futuro in listos:
+            if futuro in leyendo:
+                i, ruta = leyendo.pop(futuro)
+                try:
+                    datos, segundos = futuro.result()
+                except Exception as e:
+                    yield i, ruta, None, e
+                    continue
+                estadisticas.leido(datos, segundos)
+                analizando[pool.submit(procesar, ruta, datos=datos)] = (i, ruta)
+            else:
+                i, ruta = analizando.pop(futuro)
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    yield i, ruta, None, e
+                else:
+                    yield i, ruta, resultado, None
+        llenar()
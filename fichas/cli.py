@@ -0,0 +1,261 @@
+"""Punto de entrada de línea de comandos (no importa tkinter ni pandas al arrancar)."""
+import argparse
+import os
+import sys
+
+from .aislamiento import LIMITE_MEMORIA_MB, LIMITE_SEGUNDOS, NOMBRE_CUARENTENA
+from .canalizacion import HILOS_LECTURA, PRECARGA
+from .fragmentos import leer_fragmento, unir_fragmentos
+from .lote import INTERVALO_VIGILANCIA, NOMBRE_SALIDA, ejecutar_lote, vigilar_lote
+from .salida import ESCRITORES, EscritorPlanilla
+from .texto import MOTOR_POR_DEFECTO, NOMBRES_MOTORES
+
+
+def _fragmento(texto):
+    try:
+        return leer_fragmento(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def agregar_opciones_salida(subparser):
+    """Opciones del resultado, comunes a extraer y unir"""
+    subparser.add_argument(
+        "-o", "--salida",
+        help=f"Archivo de salida (por defecto <carpeta>/{NOMBRE_SALIDA}); "
+             "la extensión se ajusta a cada formato"
+    )
+    subparser.add_argument(
+        "-f", "--formato",
+        nargs="+",
+        choices=sorted(ESCRITORES),
+        help="Formatos de salida (varios a la vez; se informa el costo de cada uno; por defecto xlsx). "
+             "parquet requiere pyarrow"
+    )
+    subparser.add_argument(
+        "--planilla",
+        metavar="XLSX",
+        help="Planilla maestra existente donde escribir las filas en las columnas D..Z "
+             "(se guarda con openpyxl: se pierden gráficos, imágenes, tablas dinámicas y parte "
+             "del formato condicional)"
+    )
+    subparser.add_argument(
+        "--hoja-planilla",
+        metavar="HOJA",
+        help="Hoja de la planilla maestra (por defecto la activa)"
+    )
+    subparser.add_argument(
+        "--clave-planilla",
+        choices=EscritorPlanilla.CLAVES,
+        default="codigo",
+        help="Deduplicar las filas de la planilla por código del programa (columna D) "
+             "o por archivo (columna AA)"
+    )
+    subparser.add_argument(
+        "--colapsar-repetidas",
+        action="store_true",
+        help="Escribir una sola fila por código del programa + cédula + fecha de inicio "
+             "(los archivos idénticos siempre se procesan una sola vez)"
+    )
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m fichas",
+        description="Extractor de datos de fichas de caracterización SENA"
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    extraer = subparsers.add_parser(
+        "extraer",
+        aliases=["extract"],
+        help="Procesar todos los PDFs de una carpeta"
+    )
+    extraer.set_defaults(comando="extraer")
+    extraer.add_argument("carpeta", help="Carpeta con los archivos PDF")
+    agregar_opciones_salida(extraer)
+    extraer.add_argument(
+        "--fragmento",
+        type=_fragmento,
+        metavar="K/N",
+        help="Procesar solo el fragmento K de N de la carpeta (reparto por hash de la ruta) y "
+             "guardar sus filas en <salida>.fragmento-K-de-N.jsonl; el resultado se arma con 'unir'"
+    )
+    extraer.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Número de procesos en paralelo (1 = secuencial)"
+    )
+    extraer.add_argument(
+        "-r", "--recursivo",
+        action="store_true",
+        help="Buscar PDFs también en las subcarpetas"
+    )
+    extraer.add_argument(
+        "--vigilar",
+        type=float,
+        nargs="?",
+        const=INTERVALO_VIGILANCIA,
+        metavar="SEGUNDOS",
+        help=f"Tras procesar la carpeta, seguir revisándola cada SEGUNDOS "
+             f"(por defecto {INTERVALO_VIGILANCIA}) y agregar al resultado los PDFs nuevos"
+    )
+    extraer.add_argument(
+        "--max-paginas",
+        type=int,
+        metavar="N",
+        help="Leer las páginas de una en una y detenerse cuando todas las columnas "
+             "tengan valor; si faltan campos tras N páginas se analiza el documento completo"
+    )
+    extraer.add_argument(
+        "--precarga",
+        type=int,
+        nargs="?",
+        const=PRECARGA,
+        metavar="N",
+        help=f"Leer por adelantado hasta N PDFs (por defecto {PRECARGA}) mientras se analizan "
+             "los anteriores; útil si la carpeta está en la red"
+    )
+    extraer.add_argument(
+        "--hilos-lectura",
+        type=int,
+        default=HILOS_LECTURA,
+        metavar="N",
+        help=f"Hilos que leen los PDFs con --precarga (por defecto {HILOS_LECTURA})"
+    )
+    extraer.add_argument(
+        "--motor-texto",
+        choices=NOMBRES_MOTORES,
+        default=MOTOR_POR_DEFECTO,
+        help="Motor de la capa de texto para los campos D..Q y Z; con pdfium o pdfminer "
+             "pdfplumber solo se usa en las páginas con la tabla de horario o de días"
+    )
+    extraer.add_argument(
+        "--perfil",
+        action="store_true",
+        help="Medir tiempos por etapa y guardar <salida>.perfil.json y .perfil.csv"
+    )
+    extraer.add_argument(
+        "--aislar",
+        action="store_true",
+        help=f"Procesar cada archivo en su propio proceso con los límites por defecto "
+             f"({LIMITE_SEGUNDOS} s y {LIMITE_MEMORIA_MB} MB)"
+    )
+    extraer.add_argument(
+        "--limite-segundos",
+        type=float,
+        metavar="S",
+        help="Tiempo máximo por archivo; los que lo superan se terminan y pasan a cuarentena"
+    )
+    extraer.add_argument(
+        "--limite-memoria",
+        type=int,
+        metavar="MB",
+        help="Memoria residente que puede sumar el proceso de cada archivo; los que la superan se terminan "
+             "y pasan a cuarentena"
+    )
+    extraer.add_argument(
+        "--reintentar-cuarentena",
+        action="store_true",
+        help=f"Reintentar (aislados, de a uno) los archivos listados en {NOMBRE_CUARENTENA} "
+             "en lugar de omitirlos"
+    )
+    extraer.add_argument(
+        "--reparar",
+        action="store_true",
+        help="Reabrir los archivos con campos faltantes (también los de la caché) y buscar esos "
+             "campos con estrategias más lentas: tablas de todas las páginas y expresiones más flexibles"
+    )
+    extraer.add_argument(
+        "--sin-cache",
+        action="store_true",
+        help="Reprocesar todos los archivos sin consultar ni actualizar la caché"
+    )
+
+    unir = subparsers.add_parser(
+        "unir",
+        aliases=["merge"],
+        help="Unir los fragmentos procesados por varios equipos en el resultado final"
+    )
+    unir.set_defaults(comando="unir")
+    unir.add_argument("carpeta", help="Carpeta procesada (donde están los fragmentos si no se indica -o)")
+    agregar_opciones_salida(unir)
+    unir.add_argument(
+        "--fragmentos",
+        type=int,
+        metavar="N",
+        help="Número de fragmentos a unir (por defecto el de los archivos presentes)"
+    )
+    return parser
+
+
+def main_unir(args):
+    salida = args.salida or os.path.join(args.carpeta, NOMBRE_SALIDA)
+    try:
+        salidas = unir_fragmentos(
+            salida,
+            args.fragmentos,
+            formatos=args.formato or ["xlsx"],
+            planilla=args.planilla,
+            hoja_planilla=args.hoja_planilla,
+            clave_planilla=args.clave_planilla,
+            colapsar_repetidas=args.colapsar_repetidas
+        )
+    except (ImportError, ValueError) as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 2
+    return 0 if salidas else 1
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    if not os.path.isdir(args.carpeta):
+        print(f"❌ La carpeta no existe: {args.carpeta}", file=sys.stderr)
+        return 2
+    if args.planilla and not os.path.isfile(args.planilla):
+        print(f"❌ La planilla no existe: {args.planilla}", file=sys.stderr)
+        return 2
+    if args.comando == "unir":
+        return main_unir(args)
+    if args.fragmento and (args.vigilar or args.formato or args.planilla or args.colapsar_repetidas):
+        print("❌ Con --fragmento el resultado se arma al unir los fragmentos: use --formato, --planilla "
+              "y --colapsar-repetidas con 'unir' (y --vigilar no está disponible)", file=sys.stderr)
+        return 2
+
+    limite_segundos = args.limite_segundos
+    limite_memoria_mb = args.limite_memoria
+    if args.aislar:
+        limite_segundos = limite_segundos or LIMITE_SEGUNDOS
+        limite_memoria_mb = limite_memoria_mb or LIMITE_MEMORIA_MB
+
+    opciones = dict(
+        salida=args.salida,
+        workers=max(1, args.workers),
+        usar_cache=not args.sin_cache,
+        max_paginas=args.max_paginas,
+        motor_texto=args.motor_texto,
+        precarga=args.precarga,
+        hilos_lectura=max(1, args.hilos_lectura),
+        perfilar=args.perfil,
+        limite_segundos=limite_segundos,
+        limite_memoria_mb=limite_memoria_mb,
+        reintentar_cuarentena=args.reintentar_cuarentena,
+        formatos=args.formato or ["xlsx"],
+        planilla=args.planilla,
+        hoja_planilla=args.hoja_planilla,
+        clave_planilla=args.clave_planilla,
+        colapsar_repetidas=args.colapsar_repetidas,
+        fragmento=args.fragmento,
+        reparar=args.reparar
+    )
+    try:
+        if args.vigilar:
+            resumen = vigilar_lote(args.carpeta, args.vigilar, recursivo=args.recursivo, **opciones)
+        else:
+            resumen = ejecutar_lote(args.carpeta, recursivo=args.recursivo, **opciones)
+    except ImportError as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 2
+    return 0 if resumen.salida else 1
@@ -0,0 +1,125 @@
+"""Búsqueda de PDFs en la carpeta (opcionalmente en subcarpetas) y detección de archivos nuevos.
+
+Los archivos se entregan como rutas relativas a la carpeta, a medida que
+se recorren los directorios con os.scandir; dentro de cada directorio el
+orden es alfabético, de modo que el recorrido es determinista.
+"""
+import os
+
+
+def _es_pdf(entrada):
+    return entrada.name.lower().endswith(".pdf") and entrada.is_file()
+
+
+def _recorrer(carpeta, relativo, recursivo, mtimes=None):
+    """Recorrer un directorio; si se pasa mtimes se anota la fecha de
+    modificación de cada directorio leído y no se entra en los ya anotados"""
+    directorio = os.path.join(carpeta, relativo) if relativo else carpeta
+    try:
+        # La fecha se toma antes de leer: un cambio posterior se detecta en la siguiente consulta
+        if mtimes is not None:
+            mtimes[relativo] = os.stat(directorio).st_mtime_ns
+        with os.scandir(directorio) as it:
+            entradas = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    for entrada in entradas:
+        ruta_relativa = os.path.join(relativo, entrada.name) if relativo else entrada.name
+        if recursivo and entrada.is_dir(follow_symlinks=False):
+            if mtimes is None or ruta_relativa not in mtimes:
+                yield from _recorrer(carpeta, ruta_relativa, recursivo, mtimes)
+        elif _es_pdf(entrada):
+            yield ruta_relativa
+
+
+def recorrer_pdfs(carpeta, recursivo=False):
+    """Generador de rutas (relativas a carpeta) de los PDFs encontrados"""
+    return _recorrer(carpeta, "", recursivo)
+
+
+def listar_pdfs(carpeta, recursivo=False):
+    """Rutas (relativas a carpeta) de los archivos PDF de la carpeta"""
+    return list(recorrer_pdfs(carpeta, recursivo))
+
+
+class VigilanteCarpeta:
+    """Detecta los PDFs que aparecen en la carpeta entre una consulta y otra.
+
+    Guarda la fecha de modificación de cada directorio recorrido y solo
+    vuelve a leer los que cambiaron (se agregó, quitó o renombró algo). Un
+    archivo nuevo se entrega cuando su tamaño no cambió desde la consulta
+    anterior, para no leer PDFs que todavía se están copiando; los que
+    fallaron se pueden marcar con volver_a_entregar para recibirlos de nuevo
+    cuando cambien.
+    """
+
+    def __init__(self, carpeta, recursivo=False):
+        self.carpeta = carpeta
+        self.recursivo = recursivo
+        self.conocidos = set()
+        self.mtimes = {}
+        self._en_copia = {}  # archivo -> tamaño en la consulta anterior
+        self._fallidos = {}  # archivo -> (tamaño, mtime) cuando falló
+
+    def _firma(self, archivo):
+        try:
+            estado = os.stat(os.path.join(self.carpeta, archivo))
+        except OSError:
+            return None
+        return estado.st_size, estado.st_mtime_ns
+
+    def _tamano(self, archivo):
+        firma = self._firma(archivo)
+        return firma[0] if firma else None
+
+    def volver_a_entregar(self, archivo):
+        """Entregar otra vez el archivo cuando su contenido cambie (p. ej. terminó de copiarse)"""
+        firma = self._firma(archivo)
+        if firma is not None:
+            self._fallidos[archivo] = firma
+
+    def nuevos(self):
+        """Generador de los PDFs no entregados antes.
+
+        La primera consulta recorre toda la carpeta y entrega todos los PDFs.
+        """
+        if not self.mtimes:
+            for archivo in _recorrer(self.carpeta, "", self.recursivo, self.mtimes):
+                self.conocidos.add(archivo)
+                yield archivo
+            return
+
+        # Solo se vuelven a leer los directorios que cambiaron (y las subcarpetas nuevas)
+        candidatos = set()
+        for relativo, mtime in list(self.mtimes.items()):
+            try:
+                actual = os.stat(os.path.join(self.carpeta, relativo) if relativo else self.carpeta).st_mtime_ns
+            except OSError:
+                del self.mtimes[relativo]
+                continue
+            if actual != mtime:
+                candidatos.update(
+                    archivo for archivo in _recorrer(self.carpeta, relativo, self.recursivo, self.mtimes)
+                    if archivo not in self.conocidos and archivo not in self._en_copia
+                )
+
+        for archivo, firma in list(self._fallidos.items()):
+            actual = self._firma(archivo)
+            if actual != firma:
+                del self._fallidos[archivo]
+                if actual is not None:
+                    self.conocidos.discard(archivo)
+                    candidatos.add(archivo)
+
+        for archivo in candidatos:
+            self._en_copia.setdefault(archivo, self._tamano(archivo))
+        for archivo, tamano in sorted(self._en_copia.items()):
+            actual = self._tamano(archivo)
+            if actual is None:
+                del self._en_copia[archivo]
+            elif actual == tamano and archivo not in candidatos:
+                del self._en_copia[archivo]
+                self.conocidos.add(archivo)
+                yield archivo
+            else:
+                self._en_copia[archivo] = actual
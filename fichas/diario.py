@@ -0,0 +1,112 @@
+"""Diario de avance de un lote para reanudarlo después de un cierre o un fallo.
+
+Cada archivo terminado se agrega como una línea JSON compacta
+[archivo, tamaño, mtime, fila, error], con la fila como lista en el orden
+de COLUMNAS, seguida de sus columnas alternativas si las tiene. La primera
+línea identifica la versión del extractor y las opciones de extracción; si
+no coinciden, el diario se descarta. Una línea incompleta al final (fallo a
+mitad de una escritura) se ignora y se recorta antes de seguir agregando.
+"""
+import json
+import os
+import time
+
+from .extraccion import COLUMNAS, VERSION_EXTRACTOR, FilaFicha
+
+# Segundos como máximo entre dos os.fsync del diario
+INTERVALO_FSYNC = 1.0
+
+
+def ruta_diario(salida):
+    """Diario que acompaña a la salida mientras el lote está en curso"""
+    return os.path.splitext(salida)[0] + ".diario.jsonl"
+
+
+class DiarioLote:
+    """Archivos terminados de un lote (append-only, una línea por archivo)"""
+
+    def __init__(self, ruta, variante=""):
+        self.ruta = ruta
+        self.cabecera = {"diario": 1, "version": VERSION_EXTRACTOR, "variante": variante, "columnas": COLUMNAS}
+        self.entradas = {}
+        self._ultimo_fsync = time.monotonic()
+        valido = self._leer()
+        self._archivo = open(ruta, "r+b" if valido else "wb")
+        if valido:
+            self._archivo.truncate(valido)
+            self._archivo.seek(valido)
+        else:
+            self.entradas = {}
+            self._agregar(self.cabecera)
+            self._sincronizar()
+
+    def _leer(self) -> int:
+        """Cargar las entradas; devuelve los bytes válidos (0 si hay que empezar de nuevo)"""
+        try:
+            with open(self.ruta, "rb") as f:
+                contenido = f.read()
+        except OSError:
+            return 0
+        valido = 0
+        for linea in contenido.splitlines(keepends=True):
+            if not linea.endswith(b"\n"):
+                break
+            try:
+                datos = json.loads(linea)
+                if valido == 0:
+                    if datos != self.cabecera:
+                        return 0
+                else:
+                    archivo, tamano, mtime, fila, error, *alternativos = datos
+                    self.entradas[archivo] = (tamano, mtime, fila, error, alternativos[0] if alternativos else ())
+            except (ValueError, TypeError):
+                break
+            valido += len(linea)
+        return valido
+
+    def _agregar(self, datos):
+        linea = json.dumps(datos, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._archivo.write(linea.encode("utf-8"))
+        self._archivo.flush()
+
+    def _sincronizar(self):
+        os.fsync(self._archivo.fileno())
+        self._ultimo_fsync = time.monotonic()
+
+    def buscar(self, archivo, ruta_pdf):
+        """(fila, error) registrados para el archivo si no cambió desde entonces; None si no está"""
+        entrada = self.entradas.get(archivo)
+        if entrada is None:
+            return None
+        tamano, mtime, fila, error, alternativos = entrada
+        try:
+            estado = os.stat(ruta_pdf)
+        except OSError:
+            return None
+        if estado.st_size != tamano or estado.st_mtime_ns != mtime:
+            return None
+        return (FilaFicha(*fila, alternativos=tuple(alternativos)) if fila is not None else None), error
+
+    def registrar(self, archivo, ruta_pdf, fila, error=None):
+        try:
+            estado = os.stat(ruta_pdf)
+        except OSError:
+            return
+        valores = fila.valores() if fila is not None else None
+        mensaje = str(error) if error is not None else None
+        alternativos = fila.alternativos if fila is not None else ()
+        self.entradas[archivo] = (estado.st_size, estado.st_mtime_ns, valores, mensaje, alternativos)
+        linea = [archivo, estado.st_size, estado.st_mtime_ns, valores, mensaje]
+        self._agregar(linea + [list(alternativos)] if alternativos else linea)
+        if time.monotonic() - self._ultimo_fsync >= INTERVALO_FSYNC:
+            self._sincronizar()
+
+    def cerrar(self, eliminar=False):
+        """Cerrar el diario; con eliminar (lote terminado) se borra el archivo"""
+        if self._archivo.closed:
+            return
+        if not eliminar:
+            self._sincronizar()
+        self._archivo.close()
+        if eliminar:
+            os.remove(self.ruta)
@@ -0,0 +1,77 @@
+"""Fichas repetidas dentro de un lote: archivos idénticos y filas repetidas.
+
+Es común que la misma ficha esté varias veces en la carpeta (copias,
+descargas renombradas, reexportaciones idénticas). DetectorDuplicados agrupa
+los archivos por tamaño y solo cuando dos tienen el mismo tamaño calcula el
+hash del contenido, de modo que cada documento distinto se procesa una sola
+vez y su fila se reutiliza para las copias.
+
+ColapsadorFilas va más allá del contenido del archivo: omite las filas cuyo
+código del programa, cédula y fecha de inicio ya aparecieron en el lote.
+"""
+import os
+
+from .cache import hash_archivo
+
+# Columnas que identifican una ficha al colapsar filas repetidas
+# (código del programa, cédula del instructor y fecha de inicio)
+CLAVE_REPETIDAS = ("D", "I", "N")
+
+
+class DetectorDuplicados:
+    """Primer archivo del lote con el mismo contenido que cada archivo nuevo"""
+
+    def __init__(self):
+        self._sin_hash = {}  # tamaño -> [(indice, ruta, hash o None)] sin comparar todavía
+        self._por_contenido = {}  # (tamaño, hash) -> indice del primero
+
+    def original(self, indice, ruta_pdf, digest=None):
+        """Índice del archivo idéntico registrado antes; None si es el primero
+        con ese contenido (y queda registrado). digest evita recalcular un
+        hash ya conocido (p. ej. el de la caché)."""
+        try:
+            tamano = os.path.getsize(ruta_pdf)
+        except OSError:
+            return None
+        pendientes = self._sin_hash.get(tamano)
+        if pendientes is None:
+            # Único archivo de este tamaño por ahora: no hace falta el hash
+            self._sin_hash[tamano] = [(indice, ruta_pdf, digest)]
+            return None
+
+        for anterior, ruta, hash_anterior in pendientes:
+            try:
+                self._por_contenido.setdefault((tamano, hash_anterior or hash_archivo(ruta)), anterior)
+            except OSError:
+                continue
+        pendientes.clear()
+        try:
+            clave = (tamano, digest or hash_archivo(ruta_pdf))
+        except OSError:
+            return None
+        primero = self._por_contenido.setdefault(clave, indice)
+        if primero == indice:
+            return None
+        return primero
+
+
+class ColapsadorFilas:
+    """Escribe solo la primera fila de cada código + cédula + fecha de inicio.
+
+    Las filas sin código del programa se escriben siempre: sin él no se
+    puede afirmar que sean la misma ficha.
+    """
+
+    def __init__(self, escribir):
+        self.escribir = escribir
+        self.vistas = set()
+        self.omitidas = 0
+
+    def __call__(self, fila, archivo=None):
+        clave = tuple(str(fila[col]) for col in CLAVE_REPETIDAS)
+        if clave[0]:
+            if clave in self.vistas:
+                self.omitidas += 1
+                return
+            self.vistas.add(clave)
+        self.escribir(fila, archivo)
@@ -0,0 +1,690 @@
+"""Extracción de campos de las fichas de caracterización SENA.
+
+Este módulo no depende de tkinter ni de pandas: puede usarse desde la
+interfaz gráfica, desde la línea de comandos o dentro de procesos hijos.
+pdfplumber (con pdfminer y Pillow) se importa al abrir la primera ficha y
+no al importar el módulo; precargar() permite adelantarlo en segundo plano.
+"""
+import io
+import re
+from functools import lru_cache
+from operator import attrgetter
+
+from .perfil import medir
+from .texto import abrir_motor_texto
+
+# Incrementar cuando cambie el contenido de las filas extraídas: invalida la caché
+VERSION_EXTRACTOR = "1"
+
+
+# Días de la tabla de horario semanal y columna de la planilla de cada uno
+DIAS_SEMANA = {"LU": "S", "MA": "T", "MI": "U", "JU": "V", "VI": "W", "SA": "X", "DO": "Y"}
+
+
+def importar_pdfplumber():
+    """Módulo pdfplumber (la primera llamada lo importa)"""
+    import pdfplumber
+
+    return pdfplumber
+
+
+@lru_cache(maxsize=None)
+def _ajustes_tablas():
+    """Los mismos ajustes que usa page.extract_tables() por defecto"""
+    from pdfplumber.table import TableSettings
+
+    return TableSettings.resolve(None)
+
+
+def precargar():
+    """Importar pdfplumber y sus dependencias antes de la primera ficha"""
+    importar_pdfplumber()
+    _ajustes_tablas()
+
+# Palabras que ubican las tablas de horario y de días en la página
+_CLAVES_TABLAS = re.compile("DESDE|HASTA|HORARIO|" + "|".join(DIAS_SEMANA), re.I)
+
+
+def _pagina_con_tablas_utiles(texto) -> bool:
+    """Si el texto de la página puede contener una tabla de horario o de días"""
+    texto = texto.upper()
+    return (
+        ("DESDE" in texto and "HASTA" in texto)
+        or "HORARIO" in texto
+        or all(dia in texto for dia in DIAS_SEMANA)
+    )
+
+
+def _contiene(bbox, x, y) -> bool:
+    x0, top, x1, bottom = bbox
+    return x0 <= x <= x1 and top <= y <= bottom
+
+
+# Dígitos a "#": la firma de una tabla no depende de los números de sus encabezados
+_SIN_DIGITOS = str.maketrans("0123456789", "#" * 10)
+
+# Filas de encabezado además de la primera (la de los días)
+_ENCABEZADOS_HORARIO = re.compile("DESDE|HASTA|HORARIO", re.I)
+
+# Diseños recordados por proceso (las plantillas distintas son pocas)
+MAX_DISENOS = 256
+
+
+def firma_tabla(filas) -> str:
+    """Encabezados de la tabla: la primera fila y las filas con DESDE, HASTA
+    u HORARIO, con su posición y los dígitos reemplazados por "#".
+
+    DisenoTabla solo mira esas filas, así que dos tablas con la misma firma
+    tienen los encabezados en las mismas celdas; las filas de datos no
+    cuentan y pueden tener cualquier texto.
+    """
+    firma = []
+    for row_idx, row in enumerate(filas):
+        texto = "\x1f".join(str(cell or "") for cell in row or ())
+        if row_idx == 0 or _ENCABEZADOS_HORARIO.search(texto):
+            firma.append(f"{row_idx}\x1e{texto.translate(_SIN_DIGITOS)}")
+    return "\x1d".join(firma)
+
+
+class DisenoTabla:
+    """Ubicación de los encabezados de una tabla.
+
+    rangos tiene, en el orden de las filas, (fila, col DESDE, col HASTA) para
+    las filas DESDE/HASTA y (fila, None, None) para las filas HORARIO; dias
+    tiene la columna de cada día si la primera fila es el encabezado LU..DO.
+    """
+
+    def __init__(self, filas):
+        self.rangos = []
+        self.dias = None
+        for row_idx, row in enumerate(filas):
+            if not row:
+                continue
+            clean_row = [str(cell or "").strip().upper() for cell in row]
+            desde_idx = hasta_idx = None
+            for col_idx, cell in enumerate(clean_row):
+                if "DESDE" in cell:
+                    desde_idx = col_idx
+                if "HASTA" in cell:
+                    hasta_idx = col_idx
+            if desde_idx is not None and hasta_idx is not None:
+                self.rangos.append((row_idx, desde_idx, hasta_idx))
+            if "HORARIO" in " ".join(clean_row):
+                self.rangos.append((row_idx, None, None))
+
+        header = [str(cell or "").strip().upper() for cell in filas[0]]
+        if set(DIAS_SEMANA).issubset(header):
+            self.dias = {dia: header.index(dia) for dia in DIAS_SEMANA}
+
+
+class DisenosTabla:
+    """Diseños de tabla ya ubicados, por firma (ver firma_tabla).
+
+    Las fichas de un mismo centro usan la misma plantilla: con la firma
+    conocida se va directo a las celdas de datos; con una firma nueva se
+    recorren todas las celdas y el diseño queda guardado.
+    """
+
+    def __init__(self, maximo=MAX_DISENOS):
+        self.maximo = maximo
+        self._disenos = {}
+        self.aciertos = 0
+        self.fallos = 0
+
+    def diseno(self, filas) -> DisenoTabla:
+        firma = firma_tabla(filas)
+        diseno = self._disenos.get(firma)
+        if diseno is not None:
+            self.aciertos += 1
+            return diseno
+        self.fallos += 1
+        diseno = DisenoTabla(filas)
+        if len(self._disenos) >= self.maximo:
+            # Descartar el más antiguo
+            del self._disenos[next(iter(self._disenos))]
+        self._disenos[firma] = diseno
+        return diseno
+
+
+DISENOS = DisenosTabla()
+
+
+class TablaFicha:
+    """Tabla extraída con sus encabezados ya ubicados.
+
+    El diseño (dónde están los encabezados) sale de disenos si se indica, o
+    de un recorrido completo de las celdas. Con él, horarios guarda los pares
+    (desde, hasta) de las filas DESDE/HASTA y HORARIO en el orden en que
+    aparecen, y dias_marcados las columnas S..Y con horas si la primera fila
+    es el encabezado LU..DO.
+    """
+
+    def __init__(self, filas, disenos=None):
+        self.filas = filas
+        self.horarios = []
+        self.dias_marcados = set()
+        if not filas:
+            return
+        diseno = disenos.diseno(filas) if disenos is not None else DisenoTabla(filas)
+
+        for row_idx, desde_idx, hasta_idx in diseno.rangos:
+            if desde_idx is not None:
+                for data_idx in range(row_idx + 1, len(filas)):
+                    data_row = filas[data_idx]
+                    if not data_row or len(data_row) <= max(desde_idx, hasta_idx):
+                        continue
+                    desde_val = str(data_row[desde_idx] or "").strip()
+                    hasta_val = str(data_row[hasta_idx] or "").strip()
+                    desde_match = re.search(r'(\d{1,2})', desde_val)
+                    hasta_match = re.search(r'(\d{1,2})', hasta_val)
+                    if desde_match and hasta_match:
+                        self.horarios.append((int(desde_match.group(1)), int(hasta_match.group(1))))
+            else:
+                numeros = []
+                for cell in filas[row_idx]:
+                    match = re.search(r'(\d{1,2})', str(cell or "").strip())
+                    if match:
+                        numeros.append(int(match.group(1)))
+                if len(numeros) >= 2:
+                    self.horarios.append((numeros[0], numeros[1]))
+
+        if diseno.dias is not None:
+            for row in filas[1:]:
+                for dia, col_letter in DIAS_SEMANA.items():
+                    cell_val = str(row[diseno.dias[dia]] or "").strip()
+                    if cell_val.isdigit():
+                        self.dias_marcados.add(col_letter)
+
+    @property
+    def util(self) -> bool:
+        return bool(self.horarios or self.dias_marcados)
+
+
+class DocumentoPDF:
+    """PDF abierto una sola vez: el texto y las tablas de cada página se calculan
+    la primera vez que se piden y se reutilizan en todos los extractores.
+
+    Solo se extraen las tablas que pueden aportar el horario o los días: las
+    páginas cuyo texto no tiene ninguna palabra clave se omiten, y en las
+    demás la geometría de las tablas se calcula completa pero el contenido
+    solo se extrae de las que contienen alguna palabra clave (ubicada con
+    page.search sobre el texto ya calculado).
+
+    Con un motor de texto (ver fichas.texto) el texto de las páginas sale de
+    ese motor y pdfplumber solo interpreta las páginas con tablas útiles.
+
+    Las tablas se interpretan con el diseño recordado en disenos (por defecto
+    el del proceso, DISENOS) cuando su firma ya se vio en otra ficha.
+
+    Las páginas se analizan de una en una (analizar_paginas): en cuanto el
+    texto y las tablas de una página quedan guardados se libera su diseño
+    (caracteres, objetos y mapa de texto de pdfplumber), de modo que la
+    memoria no crece con el número de páginas del documento.
+    """
+
+    def __init__(self, pdf, perfil=None, motor=None, disenos=DISENOS):
+        self.pdf = pdf
+        self.paginas = pdf.pages
+        self.perfil = perfil
+        self.motor = motor
+        self.disenos = disenos
+        if perfil is not None:
+            perfil.paginas = len(self.paginas)
+        self._textos = {}
+        self._tablas = {}
+        # Contadores de análisis por página (deben quedar en 0 o 1)
+        self.conteo_texto = [0] * len(self.paginas)
+        self.conteo_tablas = [0] * len(self.paginas)
+
+    def indices(self, n_paginas=None):
+        """Índices de las primeras n_paginas páginas (todas si es None)"""
+        total = len(self.paginas)
+        return range(total if n_paginas is None else min(n_paginas, total))
+
+    def _contar(self, conteo, idx):
+        conteo[idx] += 1
+        if conteo[idx] > 1 and self.perfil is not None:
+            self.perfil.analisis_repetidos += 1
+
+    def texto_pagina(self, idx) -> str:
+        if idx not in self._textos:
+            self._contar(self.conteo_texto, idx)
+            with medir(self.perfil, "texto"):
+                if self.motor is not None:
+                    self._textos[idx] = self.motor.texto_pagina(idx)
+                else:
+                    self._textos[idx] = self.paginas[idx].extract_text() or ""
+        return self._textos[idx]
+
+    def tablas_pagina(self, idx) -> list:
+        """TablaFicha con horario o días de la página"""
+        if idx not in self._tablas:
+            self._contar(self.conteo_tablas, idx)
+            texto = self.texto_pagina(idx)
+            aciertos = self.disenos.aciertos if self.disenos is not None else 0
+            with medir(self.perfil, "tablas"):
+                tablas = self._extraer_tablas(idx, texto)
+                interpretadas = (TablaFicha(filas, self.disenos) for filas in tablas)
+                self._tablas[idx] = [tabla for tabla in interpretadas if tabla.util]
+            if self.perfil is not None:
+                self.perfil.tablas += len(tablas)
+                if self.disenos is not None:
+                    self.perfil.disenos_reutilizados += self.disenos.aciertos - aciertos
+        return self._tablas[idx]
+
+    def _extraer_tablas(self, idx, texto) -> list:
+        if not _pagina_con_tablas_utiles(texto):
+            return []
+        pagina = self.paginas[idx]
+        claves = pagina.search(_CLAVES_TABLAS, return_chars=False, return_groups=False)
+        ajustes = _ajustes_tablas()
+        encontradas = pagina.find_tables(ajustes)
+        ajustes_texto = ajustes.text_settings or {}
+        if not claves:
+            # El texto tiene las palabras pero la búsqueda no las ubicó: se extraen todas
+            return [tabla.extract(**ajustes_texto) for tabla in encontradas]
+        centros = [((c["x0"] + c["x1"]) / 2, (c["top"] + c["bottom"]) / 2) for c in claves]
+        return [
+            tabla.extract(**ajustes_texto) for tabla in encontradas
+            if any(_contiene(tabla.bbox, x, y) for x, y in centros)
+        ]
+
+    def liberar_pagina(self, idx):
+        """Descartar el diseño de la página ya analizada (su texto y tablas se conservan)"""
+        self.paginas[idx].close()
+
+    def analizar_paginas(self, n_paginas=None):
+        """Texto y tablas de las primeras n_paginas páginas, liberando cada una al terminarla"""
+        for idx in self.indices(n_paginas):
+            if idx in self._tablas:
+                continue
+            self.texto_pagina(idx)
+            self.tablas_pagina(idx)
+            self.liberar_pagina(idx)
+
+    def analisis_repetidos(self) -> int:
+        """Veces que el texto o las tablas de una página se calcularon de nuevo (debe ser 0)"""
+        return sum(conteo - 1 for conteo in self.conteo_texto + self.conteo_tablas if conteo > 1)
+
+
+# =========================
+# Funciones de procesamiento PDF (copiadas del código original)
+# =========================
+def formatear_cedula(raw: str) -> str:
+    if not raw:
+        return ""
+    digits = re.sub(r"[^0-9]", "", raw)
+    if not digits:
+        return ""
+    try:
+        return f"{int(digits):,}".replace(",", ".")
+    except Exception:
+        return digits
+
+
+def formatear_fecha(dia: str, mes: str, anio: str) -> str:
+    return f"{int(dia)}/{int(mes)}/20{int(anio)}"
+
+
+def safe_extract_text(doc, n_paginas=None) -> str:
+    pages_text = []
+    for p_idx in doc.indices(n_paginas):
+        pages_text.append(doc.texto_pagina(p_idx))
+    return "\n".join(pages_text)
+
+
+def extraer_horario_maximo(doc, n_paginas=None) -> str:
+    """Horario de mayor rango ("desde A hasta") entre las tablas de las páginas"""
+    horarios_encontrados = [
+        horario
+        for p_idx in doc.indices(n_paginas)
+        for tabla in doc.tablas_pagina(p_idx)
+        for horario in tabla.horarios
+    ]
+    if horarios_encontrados:
+        desde_hora, hasta_hora = max(horarios_encontrados, key=lambda x: x[1] - x[0])
+        return f"{desde_hora} A {hasta_hora}"
+    return ""
+
+
+def extraer_dias_semana(doc, n_paginas=None) -> dict:
+    dias_semana = {col: "" for col in DIAS_SEMANA.values()}
+    for p_idx in doc.indices(n_paginas):
+        for tabla in doc.tablas_pagina(p_idx):
+            for col_letter in tabla.dias_marcados:
+                dias_semana[col_letter] = "X"
+    return dias_semana
+
+
+# Columnas de la planilla, en el orden en que se escriben
+COLUMNAS = ["D", "H", "I", "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z"]
+
+
+# Estado de cada campo de una fila
+ENCONTRADO = "encontrado"
+ALTERNATIVO = "alternativo"  # de una fuente secundaria o valor por defecto
+FALTANTE = "faltante"
+
+# Columnas de los días: se consideran un solo campo (faltan si no hay ninguno marcado)
+_COLUMNAS_DIAS = tuple(DIAS_SEMANA.values())
+
+
+class FilaFicha:
+    """Fila D..Z de una ficha con esquema fijo (un atributo por columna).
+
+    Ocupa bastante menos memoria que un dict con las mismas claves y se
+    consulta igual: fila["D"]. Los valores son los de la planilla: texto,
+    "X" o "" en los días S..Y y el cupo Z entero o "" si no se encontró.
+    como_dict() da el dict equivalente (p. ej. para JSON).
+
+    alternativos son las columnas cuyo valor no salió de su fuente principal
+    (p. ej. la cédula tomada junto a "Instructor" o "NINGUNA" por defecto);
+    estado() informa si cada campo se encontró, salió de una alternativa o
+    falta. La igualdad solo compara los valores.
+    """
+
+    __slots__ = (*COLUMNAS, "alternativos")
+
+    def __init__(self, *valores, alternativos=()):
+        for col, valor in zip(COLUMNAS, valores, strict=True):
+            setattr(self, col, valor)
+        self.alternativos = alternativos
+
+    @classmethod
+    def desde_dict(cls, fila):
+        return cls(*(fila[col] for col in COLUMNAS), alternativos=tuple(fila.get("alternativos", ())))
+
+    def __getitem__(self, col):
+        if col not in _CONJUNTO_COLUMNAS:
+            raise KeyError(col)
+        return getattr(self, col)
+
+    def keys(self):
+        return list(COLUMNAS)
+
+    def valores(self) -> tuple:
+        return _VALORES_FILA(self)
+
+    def como_dict(self) -> dict:
+        return dict(zip(COLUMNAS, self.valores()))
+
+    def faltantes(self) -> list:
+        """Columnas sin valor (las de los días, todas juntas si no hay ningún día marcado)"""
+        faltan = [col for col in COLUMNAS if col not in _COLUMNAS_DIAS and getattr(self, col) == ""]
+        if not any(getattr(self, col) for col in _COLUMNAS_DIAS):
+            faltan.extend(_COLUMNAS_DIAS)
+        return faltan
+
+    def estado(self) -> dict:
+        """ENCONTRADO, ALTERNATIVO o FALTANTE por columna"""
+        estados = dict.fromkeys(COLUMNAS, ENCONTRADO)
+        estados.update(dict.fromkeys(self.alternativos, ALTERNATIVO))
+        estados.update(dict.fromkeys(self.faltantes(), FALTANTE))
+        return estados
+
+    def __eq__(self, otra):
+        if not isinstance(otra, FilaFicha):
+            return NotImplemented
+        return self.valores() == otra.valores()
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Entre procesos viaja como la tupla de valores (y las alternativas, si hay)
+        if self.alternativos:
+            return FilaFicha, self.valores(), self.alternativos
+        return FilaFicha, self.valores()
+
+    def __setstate__(self, alternativos):
+        self.alternativos = alternativos
+
+    def __repr__(self):
+        return f"FilaFicha({self.como_dict()!r})"
+
+
+_CONJUNTO_COLUMNAS = frozenset(COLUMNAS)
+_VALORES_FILA = attrgetter(*COLUMNAS)
+
+
+class ExtractorCampos:
+    """Búsqueda de todos los campos de texto con un solo recorrido del texto.
+
+    Cada campo es (nombre, palabras clave en minúsculas, patrón) y el patrón
+    empieza por una de sus palabras clave. Una única expresión con todas las
+    palabras clave recorre el texto en minúsculas y el patrón completo del
+    campo (con re.I, sobre el texto original) solo se prueba en esas
+    posiciones, por lo que el resultado es el mismo que un re.search por campo.
+    Las palabras clave no se solapan entre sí.
+    """
+
+    def __init__(self, campos):
+        self.patrones = {nombre: re.compile(patron, re.I) for nombre, _, patron in campos}
+        self.campo_de_clave = {clave: nombre for nombre, claves, _ in campos for clave in claves}
+        # Alternativas agrupadas por letra inicial: el motor de re descarta
+        # rápidamente las posiciones que no empiezan por ninguna
+        por_inicial = {}
+        for clave in self.campo_de_clave:
+            por_inicial.setdefault(clave[0], []).append(re.escape(clave[1:]))
+        self.anclas = re.compile("|".join(
+            f"{re.escape(inicial)}(?:{'|'.join(restos)})" for inicial, restos in por_inicial.items()
+        ))
+
+    def buscar(self, texto) -> dict:
+        """Primera coincidencia (match o None) de cada campo"""
+        bajo = texto.lower()
+        if len(bajo) != len(texto) or "ı" in bajo or "ſ" in bajo:
+            # lower() cambió la longitud (p. ej. "İ") o hay letras que re.I
+            # equipara con "i"/"s": búsqueda independiente por campo
+            return {nombre: patron.search(texto) for nombre, patron in self.patrones.items()}
+
+        coincidencias = dict.fromkeys(self.patrones)
+        pendientes = len(coincidencias)
+        for ancla in self.anclas.finditer(bajo):
+            nombre = self.campo_de_clave[ancla.group()]
+            if coincidencias[nombre] is not None:
+                continue
+            m = self.patrones[nombre].match(texto, ancla.start())
+            if m:
+                coincidencias[nombre] = m
+                pendientes -= 1
+                if not pendientes:
+                    break
+        return coincidencias
+
+
+CAMPOS_TEXTO = ExtractorCampos([
+    ("codigo", ("codigo", "código"), r"c[oó]digo(?:\s+del)?(?:\s+Programa)?(?:\s+o\s+EDT)?[\s:]*([0-9]{4,})"),
+    ("programas_especiales", ("programas especiales",), r"Programas especiales\s*[:\-]?\s*([^\n\r]*)"),
+    ("convenio", ("convenio",), r"Convenio\s*[:\-]?\s*([^\n\r]*)"),
+    ("cedula", ("cedula", "cedulo"), r"cedul[ao]\s*[:\-]?\s*([0-9\.,]+)"),
+    ("instructor", ("instructor",), r"Instructor[\s\S]{0,80}?([0-9]{6,12})"),
+    ("inicio", ("de inicio",), r"De inicio\s+(\d{1,2})\s+(\d{1,2})\s+(\d{2})"),
+    ("finalizacion", ("de finalizacion", "de finalización"), r"De finalizaci[oó]n\s+(\d{1,2})\s+(\d{1,2})\s+(\d{2})"),
+    ("municipio", ("municipio",), r"MUNICIPIO\s*[:\-]?\s*(.*)"),
+    ("lugar", ("lugar donde se dicta",), r"LUGAR DONDE SE DICTA\s*[:\-]?\s*(.*)"),
+    ("vereda", ("vereda",), r"VEREDA\s*[:\-]?\s*(.*)"),
+    ("cupo", ("cupo",), r"Cupo\s*[:\-]?\s*(\d+)"),
+])
+
+
+# Campos de texto que alimentan cada columna: la columna tiene valor en
+# cuanto aparece cualquiera de ellos
+CAMPOS_POR_COLUMNA = {
+    "D": ("codigo",),
+    "H": ("programas_especiales", "convenio"),
+    "I": ("cedula", "instructor"),
+    "N": ("inicio",),
+    "O": ("finalizacion",),
+    "P": ("municipio",),
+    "Q": ("lugar", "vereda"),
+    "Z": ("cupo",),
+}
+
+
+def extraer_campos_texto(texto) -> dict:
+    """Columnas que salen del texto del documento (D, H, I, N, O, P, Q y Z)"""
+    return valores_campos_texto(CAMPOS_TEXTO.buscar(texto))
+
+
+def valores_campos_texto(campos) -> dict:
+    """Columnas de texto a partir de las coincidencias de CAMPOS_TEXTO.buscar"""
+
+    # Código programa
+    codigo_programa = ""
+    m = campos["codigo"]
+    if m:
+        codigo_programa = m.group(1)
+
+    # Programa especial / Convenio
+    programas_especiales_val = ""
+    convenio_val = ""
+    m = campos["programas_especiales"]
+    if m:
+        val = m.group(1).strip()
+        if val and val.lower() not in ["programas especiales", "programas especiales:"]:
+            programas_especiales_val = val
+    m = campos["convenio"]
+    if m:
+        val = m.group(1).strip()
+        if val and val.lower() not in ["convenio", "convenio:"]:
+            convenio_val = val
+    if (not programas_especiales_val and not convenio_val) or \
+    ((programas_especiales_val.lower() == "no aplica" if programas_especiales_val else True) and
+        (convenio_val.lower() == "no aplica" if convenio_val else True)):
+        programa_especial = "NINGUNA"
+    elif programas_especiales_val and programas_especiales_val.lower() != "no aplica":
+        programa_especial = programas_especiales_val
+    elif convenio_val and convenio_val.lower() != "no aplica":
+        programa_especial = convenio_val
+    else:
+        programa_especial = "NINGUNA"
+
+    # Cédula
+    cedula = ""
+    m = campos["cedula"]
+    if m:
+        cedula = formatear_cedula(m.group(1))
+    else:
+        m2 = campos["instructor"]
+        if m2:
+            cedula = formatear_cedula(m2.group(1))
+
+    # Fechas
+    fecha_inicio_fmt = ""
+    fecha_final_fmt = ""
+    m = campos["inicio"]
+    if m:
+        fecha_inicio_fmt = formatear_fecha(m.group(1), m.group(2), m.group(3))
+    m = campos["finalizacion"]
+    if m:
+        fecha_final_fmt = formatear_fecha(m.group(1), m.group(2), m.group(3))
+
+    # Municipio
+    municipio = ""
+    m = campos["municipio"]
+    if m:
+        municipio = m.group(1).strip()
+
+    # Lugar + Vereda
+    m_lugar = campos["lugar"]
+    m_vereda = campos["vereda"]
+    lugar_val = m_lugar.group(1).strip() if m_lugar and m_lugar.group(1).strip() else ""
+    vereda_val = m_vereda.group(1).strip() if m_vereda and m_vereda.group(1).strip() else ""
+    if lugar_val and vereda_val:
+        if lugar_val.lower() == vereda_val.lower():
+            lugar_completo = lugar_val
+        else:
+            lugar_completo = f"{lugar_val} - {vereda_val}"
+    elif lugar_val:
+        lugar_completo = lugar_val
+    elif vereda_val:
+        lugar_completo = vereda_val
+    else:
+        lugar_completo = ""
+
+    # Cupo
+    cupo = ""
+    m = campos["cupo"]
+    if m:
+        cupo = int(m.group(1))
+
+    return {
+        "D": codigo_programa,
+        "H": programa_especial,
+        "I": cedula,
+        "N": fecha_inicio_fmt,
+        "O": fecha_final_fmt,
+        "P": municipio,
+        "Q": lugar_completo,
+        "Z": cupo
+    }
+
+
+def extraer_fila(doc, n_paginas=None):
+    """Fila D..Z usando las primeras n_paginas páginas (todas si es None).
+
+    Devuelve (FilaFicha, completa); completa indica que todas las columnas de
+    texto, el horario y los días de la semana se encontraron.
+    """
+    doc.analizar_paginas(n_paginas)
+    texto = safe_extract_text(doc, n_paginas)
+    with medir(doc.perfil, "regex"):
+        campos = CAMPOS_TEXTO.buscar(texto)
+        valores = valores_campos_texto(campos)
+    horario = extraer_horario_maximo(doc, n_paginas)
+    dias_semana = extraer_dias_semana(doc, n_paginas)
+
+    fila = {**valores, "R": horario, **dias_semana}
+    completa = (
+        all(any(campos[c] for c in nombres) for nombres in CAMPOS_POR_COLUMNA.values())
+        and bool(horario)
+        and "X" in dias_semana.values()
+    )
+    alternativos = []
+    if not campos["programas_especiales"] and not campos["convenio"]:
+        alternativos.append("H")
+    if not campos["cedula"] and campos["instructor"]:
+        alternativos.append("I")
+    return FilaFicha(*(fila[col] for col in COLUMNAS), alternativos=tuple(alternativos)), completa
+
+
+def procesar_pdf(pdf_path, max_paginas=None, perfil=None, motor_texto=None, datos=None, reparar=False):
+    """Extraer la fila D..Z (FilaFicha) de una ficha.
+
+    Por defecto se analizan todas las páginas. Con max_paginas las páginas se
+    leen de una en una y la lectura se detiene en cuanto todas las columnas
+    tienen valor (el horario es el de mayor rango entre las páginas leídas);
+    si tras max_paginas páginas aún falta alguna, se analiza el documento
+    completo. Si se pasa un PerfilArchivo, se registran en él los tiempos
+    por etapa y el número de páginas y tablas. motor_texto elige el motor
+    de la capa de texto (ver fichas.texto; por defecto pdfplumber). Si se
+    pasan datos (el contenido del PDF ya leído) el archivo no se vuelve a leer.
+    Con reparar, los campos que falten tras el análisis normal se buscan con
+    las estrategias más lentas de fichas.reparacion.
+    """
+    with medir(perfil, "abrir"):
+        pdf = importar_pdfplumber().open(io.BytesIO(datos) if datos is not None else pdf_path)
+        try:
+            motor = abrir_motor_texto(motor_texto, datos if datos is not None else pdf_path)
+        except BaseException:
+            pdf.close()
+            raise
+    # Un único análisis del documento compartido por todos los extractores
+    try:
+        with pdf:
+            doc = DocumentoPDF(pdf, perfil, motor)
+            if max_paginas:
+                for n_paginas in doc.indices(max_paginas):
+                    fila, completa = extraer_fila(doc, n_paginas + 1)
+                    if completa:
+                        return fila
+            fila, _ = extraer_fila(doc)
+            if reparar and fila.faltantes():
+                # Importado aquí: reparacion usa este módulo
+                from .reparacion import completar_faltantes
+
+                fila = completar_faltantes(doc, fila)
+            return fila
+    finally:
+        if motor is not None:
+            motor.cerrar()
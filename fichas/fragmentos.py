@@ -0,0 +1,219 @@
+"""Lotes repartidos en fragmentos entre varios equipos y unión de sus resultados.
+
+Cada archivo pertenece a un único fragmento k de N según el hash de su ruta
+relativa, de modo que varios nodos que ven la misma carpeta (compartida)
+se reparten los PDFs sin coordinarse. Cada nodo escribe sus filas en
+<salida>.fragmento-k-de-N.jsonl y unir_fragmentos las combina en el mismo
+resultado_total.xlsx, con el mismo orden de filas, que una ejecución en un
+solo equipo.
+
+El orden de una ejecución normal es el del recorrido de la carpeta:
+alfabético dentro de cada directorio y las subcarpetas en su lugar, es
+decir, el orden de las rutas comparadas componente a componente. Cada
+fragmento ya está en ese orden, así que la unión es una mezcla ordenada que
+no necesita cargar todas las filas en memoria.
+"""
+import glob
+import hashlib
+import heapq
+import json
+import os
+import re
+import time
+
+from .duplicados import ColapsadorFilas
+from .extraccion import COLUMNAS, VERSION_EXTRACTOR, FilaFicha
+from .reparacion import InformeCampos
+from .salida import (
+    ESCRITORES,
+    NOMBRES_FORMATO,
+    EscritorCampos,
+    EscritorPlanilla,
+    EscritorSalidas,
+    EscritorTexto,
+    ruta_campos,
+    ruta_formato,
+    ruta_parcial,
+)
+
+_NOMBRE_FRAGMENTO = re.compile(r"\.fragmento-(\d+)-de-(\d+)\.jsonl$")
+
+
+def _ruta_normalizada(archivo):
+    """Ruta relativa con "/" (los nodos pueden ser Windows o Linux)"""
+    return archivo.replace("\\", "/")
+
+
+def fragmento_de(archivo, total) -> int:
+    """Fragmento (1..total) al que pertenece el archivo (ruta relativa a la carpeta)"""
+    digest = hashlib.sha1(_ruta_normalizada(archivo).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % total + 1
+
+
+def orden_recorrido(archivo):
+    """Clave de orden equivalente al recorrido de recorrer_pdfs"""
+    return tuple(_ruta_normalizada(archivo).split("/"))
+
+
+def leer_fragmento(texto) -> tuple:
+    """(k, N) a partir de "k/N"; ValueError si no es válido"""
+    try:
+        indice, total = (int(parte) for parte in texto.split("/"))
+    except ValueError:
+        raise ValueError(f"fragmento inválido: {texto!r} (se espera k/N, p. ej. 2/8)") from None
+    if not 1 <= indice <= total:
+        raise ValueError(f"fragmento inválido: {texto!r} (k debe estar entre 1 y N)")
+    return indice, total
+
+
+def nombre_fragmento(ruta, indice, total):
+    """Ruta con el sufijo del fragmento antes de las extensiones
+    (resultado_total.cache.sqlite -> resultado_total.fragmento-2-de-8.cache.sqlite)"""
+    directorio, nombre = os.path.split(ruta)
+    base, _, extensiones = nombre.partition(".")
+    return os.path.join(directorio, f"{base}.fragmento-{indice}-de-{total}.{extensiones}")
+
+
+def ruta_fragmento(salida, indice, total):
+    """Archivo de filas del fragmento que acompaña a la salida"""
+    return os.path.splitext(salida)[0] + f".fragmento-{indice}-de-{total}.jsonl"
+
+
+class EscritorFragmento(EscritorTexto):
+    """Filas de un fragmento como [archivo, [D..Z]] por línea (más la lista de
+    columnas alternativas, si la fila tiene), tras una cabecera con el
+    fragmento, la versión del extractor y las opciones de extracción.
+
+    El archivo se escribe aunque el fragmento no tenga filas: su existencia
+    indica que el fragmento terminó.
+    """
+
+    formato = "fragmento"
+    codificacion = "utf-8"
+
+    def __init__(self, salida, indice, total, variante="", anexar=False):
+        super().__init__(salida, anexar=False)
+        self.cabecera = {
+            "fragmento": indice,
+            "de": total,
+            "version": VERSION_EXTRACTOR,
+            "variante": variante,
+            "columnas": COLUMNAS,
+        }
+
+    def _encabezado(self):
+        self.archivo.write(json.dumps(self.cabecera, ensure_ascii=False) + "\n")
+
+    def escribir(self, fila, archivo=None):
+        if self.archivo is None:
+            self._abrir()
+        datos = [archivo, fila.valores()]
+        if fila.alternativos:
+            datos.append(list(fila.alternativos))
+        self.archivo.write(json.dumps(datos, ensure_ascii=False) + "\n")
+        self.filas += 1
+
+    def cerrar(self):
+        if self.archivo is None:
+            self._abrir()
+        return super().cerrar()
+
+
+def buscar_fragmentos(salida, total=None):
+    """Rutas de los fragmentos 1..N de la salida, en orden.
+
+    Sin total, N se deduce de los archivos presentes. ValueError si falta
+    alguno o hay fragmentos de repartos distintos y no se indicó total.
+    """
+    base = os.path.splitext(salida)[0]
+    encontrados = {}
+    for ruta in glob.glob(glob.escape(base) + ".fragmento-*-de-*.jsonl"):
+        m = _NOMBRE_FRAGMENTO.search(ruta)
+        if m:
+            encontrados.setdefault(int(m.group(2)), {})[int(m.group(1))] = ruta
+    if not encontrados:
+        raise ValueError(f"No hay fragmentos de {os.path.basename(salida)} en {os.path.dirname(salida) or '.'}")
+    if total is None:
+        if len(encontrados) > 1:
+            raise ValueError(
+                f"Hay fragmentos de repartos distintos ({', '.join(f'de {n}' for n in sorted(encontrados))}); "
+                "indique cuántos fragmentos unir"
+            )
+        total = next(iter(encontrados))
+    presentes = encontrados.get(total, {})
+    faltan = [k for k in range(1, total + 1) if k not in presentes]
+    if faltan:
+        raise ValueError(f"Faltan los fragmentos {', '.join(map(str, faltan))} de {total}")
+    return [presentes[k] for k in range(1, total + 1)]
+
+
+def _filas_fragmento(ruta, cabecera):
+    """(clave de orden, archivo, fila) de un fragmento, verificando su cabecera y su orden"""
+    with open(ruta, encoding="utf-8") as f:
+        primera = json.loads(f.readline() or "null")
+        if not isinstance(primera, dict) or {k: v for k, v in primera.items() if k != "fragmento"} != cabecera:
+            raise ValueError(
+                f"{os.path.basename(ruta)} se generó con otra versión u otras opciones de extracción "
+                "que el resto de los fragmentos"
+            )
+        anterior = None
+        for linea in f:
+            archivo, valores, *alternativos = json.loads(linea)
+            clave = orden_recorrido(archivo)
+            if anterior is not None and clave < anterior:
+                raise ValueError(f"{os.path.basename(ruta)} no está en el orden de la carpeta")
+            anterior = clave
+            yield clave, archivo, FilaFicha(*valores, alternativos=tuple(alternativos[0] if alternativos else ()))
+
+
+def unir_fragmentos(salida, total=None, formatos=("xlsx",), planilla=None, hoja_planilla=None,
+                    clave_planilla="codigo", colapsar_repetidas=False, log=print):
+    """Combinar los fragmentos de la salida en cada formato de formatos (y en la
+    planilla maestra, si se indica), con el orden de una ejecución en un solo
+    equipo. Con colapsar_repetidas se aplica ColapsadorFilas sobre el
+    resultado combinado. Devuelve las rutas generadas.
+    """
+    rutas = buscar_fragmentos(salida, total)
+    with open(rutas[0], encoding="utf-8") as f:
+        cabecera = json.loads(f.readline() or "null")
+    if not isinstance(cabecera, dict) or cabecera.get("version") != VERSION_EXTRACTOR:
+        raise ValueError(f"{os.path.basename(rutas[0])} se generó con otra versión del extractor")
+    cabecera.pop("fragmento", None)
+    log(f"🧩 Uniendo {len(rutas)} fragmentos de {os.path.basename(salida)}")
+
+    escritores = [ESCRITORES[formato](ruta_formato(salida, formato)) for formato in formatos]
+    if planilla:
+        escritores.append(EscritorPlanilla(planilla, hoja_planilla, clave_planilla))
+    escritor = EscritorSalidas(escritores, ruta_parcial(salida))
+    colapsador = ColapsadorFilas(escritor.escribir) if colapsar_repetidas else None
+    campos = InformeCampos(escritor=EscritorCampos(ruta_campos(salida)))
+    escribir = campos.envolver(colapsador or escritor.escribir)
+
+    inicio = time.perf_counter()
+    try:
+        filas = heapq.merge(*(_filas_fragmento(ruta, cabecera) for ruta in rutas), key=lambda fila: fila[0])
+        for _, archivo, fila in filas:
+            escribir(fila, archivo)
+    except BaseException:
+        escritor.abortar()
+        campos.abortar()
+        raise
+    salidas = escritor.cerrar()
+    ruta_estado = campos.cerrar()
+
+    for e in escritor.escritores:
+        if isinstance(e, EscritorPlanilla):
+            log(f"📒 Planilla maestra actualizada: {os.path.basename(e.salida)} "
+                f"({e.agregadas} filas nuevas, {e.actualizadas} actualizadas)")
+        elif e.salida in salidas:
+            log(f"💾 Archivo {NOMBRES_FORMATO[e.formato]} guardado: {os.path.basename(e.salida)}")
+    log(f"📊 {escritor.filas} filas unidas en {time.perf_counter() - inicio:.2f} s")
+    if colapsador and colapsador.omitidas:
+        log(f"🧹 {colapsador.omitidas} filas repetidas (mismo código, cédula y fecha de inicio) omitidas")
+    for linea in campos.resumen():
+        log(linea)
+    if ruta_estado:
+        log(f"🔎 Estado de los campos por archivo: {os.path.basename(ruta_estado)}")
+    if not salidas:
+        log("❌ Los fragmentos no tienen filas")
+    return salidas
@@ -0,0 +1,539 @@
+"""Procesamiento por lotes de carpetas de fichas y escritura del resultado."""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+from .aislamiento import (
+    LIMITE_MEMORIA_MB,
+    LIMITE_SEGUNDOS,
+    NOMBRE_CUARENTENA,
+    Cuarentena,
+    LimiteExcedido,
+    memoria_medible,
+    procesar_aislado,
+)
+from .cache import NOMBRE_CACHE, CacheResultados
+from .canalizacion import HILOS_LECTURA, EstadisticasCanal, procesar_canalizado
+from .diario import DiarioLote, ruta_diario
+from .descubrimiento import VigilanteCarpeta, recorrer_pdfs
+from .duplicados import ColapsadorFilas, DetectorDuplicados
+from .extraccion import precargar, procesar_pdf
+from .fragmentos import EscritorFragmento, fragmento_de, nombre_fragmento, ruta_fragmento
+from .perfil import InformePerfil, PerfilArchivo, pico_memoria_mb, reiniciar_pico_memoria
+from .reparacion import InformeCampos
+from .salida import (
+    ESCRITORES,
+    NOMBRES_FORMATO,
+    EscritorCampos,
+    EscritorPlanilla,
+    EscritorSalidas,
+    OrdenadorFilas,
+    ruta_campos,
+    ruta_formato,
+    ruta_parcial,
+)
+from .texto import MOTOR_POR_DEFECTO, verificar_motor_texto
+
+NOMBRE_SALIDA = "resultado_total.xlsx"
+
+# Segundos entre consultas del modo vigilancia
+INTERVALO_VIGILANCIA = 30
+
+# Archivos enviados al pool por worker: los siguientes se piden a rutas_pdf
+# (recorrido de la carpeta, caché) a medida que terminan los anteriores
+EN_VUELO_POR_WORKER = 2
+
+
+def procesar_archivo(ruta_pdf, max_paginas=None, perfilar=False, motor_texto=None, datos=None, reparar=False):
+    """procesar_pdf para un worker: devuelve (fila, perfil); perfil es None si no se mide.
+
+    El perfil incluye cuánto subió el pico de memoria residente del proceso
+    durante el archivo, si la plataforma permite reiniciarlo entre archivos:
+    el pico absoluto es casi siempre la memoria que el proceso ya retenía.
+    """
+    if not perfilar:
+        return procesar_pdf(ruta_pdf, max_paginas, motor_texto=motor_texto, datos=datos, reparar=reparar), None
+    perfil = PerfilArchivo(os.path.basename(ruta_pdf))
+    # Recién reiniciado, el pico es la memoria residente actual
+    inicial = pico_memoria_mb() if reiniciar_pico_memoria() else None
+    inicio = time.perf_counter()
+    fila = procesar_pdf(ruta_pdf, max_paginas, perfil, motor_texto, datos, reparar)
+    perfil.total = time.perf_counter() - inicio
+    pico = pico_memoria_mb() if inicial is not None else None
+    if pico is not None:
+        perfil.memoria_mb = pico - inicial
+    return fila, perfil
+
+
+def procesar_lote(rutas_pdf, workers=1, max_paginas=None, perfilar=False,
+                  limite_segundos=None, limite_memoria_mb=None, motor_texto=None,
+                  precarga=None, hilos_lectura=HILOS_LECTURA, estadisticas=None, reparar=False):
+    """Procesar PDFs entregando (indice, ruta, fila, error, perfil) a medida que terminan.
+
+    rutas_pdf puede ser cualquier iterable (p. ej. un generador que todavía
+    está recorriendo la carpeta): los archivos se procesan según llegan.
+
+    Con workers > 1 los archivos se reparten en un pool de procesos y los
+    resultados llegan en orden de finalización; el índice permite reconstruir
+    el orden original de rutas_pdf. max_paginas, motor_texto y reparar se pasan a
+    procesar_pdf y con perfilar cada resultado trae el PerfilArchivo con sus tiempos por etapa.
+    Con limite_segundos o limite_memoria_mb cada archivo se procesa en su
+    propio proceso y los que exceden el límite llegan con LimiteExcedido.
+    Si no, con precarga se leen por adelantado hasta precarga archivos con
+    hilos_lectura hilos (ver procesar_canalizado); estadisticas (un
+    EstadisticasCanal) recibe las esperas y la profundidad de las colas.
+    """
+    procesar = partial(
+        procesar_archivo, max_paginas=max_paginas, perfilar=perfilar, motor_texto=motor_texto, reparar=reparar
+    )
+    if limite_segundos or limite_memoria_mb:
+        # Cada archivo usa un proceso nuevo: con fork heredan pdfplumber ya
+        # importado en lugar de importarlo dentro de su límite de tiempo
+        precargar()
+        for i, ruta, resultado, error in procesar_aislado(
+                procesar, rutas_pdf, workers, limite_segundos, limite_memoria_mb):
+            fila, perfil = resultado if error is None else (None, None)
+            yield i, ruta, fila, error, perfil
+        return
+
+    if precarga:
+        for i, ruta, resultado, error in procesar_canalizado(
+                procesar, rutas_pdf, workers, precarga, hilos_lectura, estadisticas):
+            fila, perfil = resultado if error is None else (None, None)
+            yield i, ruta, fila, error, perfil
+        return
+
+    if workers <= 1:
+        for i, ruta in enumerate(rutas_pdf):
+            try:
+                fila, perfil = procesar(ruta)
+                yield i, ruta, fila, None, perfil
+            except Exception as e:
+                yield i, ruta, None, e, None
+        return
+
+    entradas = iter(enumerate(rutas_pdf))
+    futuros = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def llenar():
+            while len(futuros) < workers * EN_VUELO_POR_WORKER:
+                siguiente = next(entradas, None)
+                if siguiente is None:
+                    return
+                i, ruta = siguiente
+                futuros[pool.submit(procesar, ruta)] = (i, ruta)
+
+        llenar()
+        while futuros:
+            listos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                i, ruta = futuros.pop(futuro)
+                try:
+                    fila, perfil = futuro.result()
+                    yield i, ruta, fila, None, perfil
+                except Exception as e:
+                    yield i, ruta, None, e, None
+            llenar()
+
+
+class ResumenLote:
+    """Contadores de una ejecución de ejecutar_lote"""
+
+    def __init__(self, total):
+        self.total = total
+        self.procesados = 0
+        self.con_error = 0
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+        self.en_cuarentena = 0
+        self.reintentados = 0
+        self.reanudados = 0
+        self.repetidos = 0
+        self.filas_colapsadas = 0
+        # Archivos de la caché reabiertos para buscar sus campos faltantes
+        self.reabiertos = 0
+        # Filas escritas que todavía tienen algún campo faltante
+        self.con_faltantes = 0
+        self.archivos_con_error = []
+        self.salida = None
+        self.salidas = []
+
+
+def abrir_diario(salida, log=print, variante=""):
+    """Abrir el diario de avance de la salida; None si no se puede"""
+    try:
+        return DiarioLote(ruta_diario(salida), variante=variante)
+    except Exception as e:
+        log(f"⚠️ No se pudo abrir el diario de avance, el lote no podrá reanudarse: {str(e)}")
+        return None
+
+
+def abrir_cache(carpeta, log=print, variante="", nombre=NOMBRE_CACHE):
+    """Abrir la caché de la carpeta; None si no se puede (p. ej. carpeta de solo lectura)"""
+    try:
+        return CacheResultados(os.path.join(carpeta, nombre), variante=variante)
+    except Exception as e:
+        log(f"⚠️ No se pudo abrir la caché, se procesarán todos los archivos: {str(e)}")
+        return None
+
+
+def ejecutar_lote(carpeta, salida=None, workers=1, log=print, progreso=None, usar_cache=True,
+                  max_paginas=None, perfilar=False, limite_segundos=None, limite_memoria_mb=None,
+                  reintentar_cuarentena=False, recursivo=False, archivos=None, anexar=False,
+                  formatos=("xlsx",), planilla=None, hoja_planilla=None, clave_planilla="codigo",
+                  motor_texto=None, colapsar_repetidas=False, fragmento=None,
+                  precarga=None, hilos_lectura=HILOS_LECTURA, reparar=False):
+    """Procesar todos los PDFs de la carpeta y guardar el resultado en Excel.
+
+    log recibe los mensajes de avance y progreso (si se indica) se llama como
+    progreso(completados, total, archivo); total crece mientras avanza la
+    búsqueda. Los PDFs se buscan con recorrer_pdfs (también en las subcarpetas
+    con recursivo) y se empiezan a procesar antes de que termine la búsqueda;
+    archivos permite indicar otra secuencia de rutas relativas a la carpeta.
+
+    El resultado se escribe en cada formato de formatos (xlsx, csv, parquet,
+    jsonl), con la ruta de salida y la extensión del formato. Con planilla,
+    las filas además se escriben en las columnas D..Z de esa planilla maestra
+    existente, deduplicadas por clave_planilla ("codigo" o "archivo"). Con
+    anexar las filas se agregan a las salidas existentes en lugar de
+    reemplazarlas. Al final se informa el costo de cada escritor.
+
+    Los archivos con el mismo contenido que otro del lote (mismo tamaño y
+    hash) no se procesan: reciben el resultado del primero. Con
+    colapsar_repetidas se escribe una sola fila por código del programa +
+    cédula + fecha de inicio (ver ColapsadorFilas).
+
+    Con fragmento=(k, N) solo se procesan los archivos del fragmento k de N
+    (ver fichas.fragmentos) y sus filas se guardan en
+    <salida>.fragmento-k-de-N.jsonl, aunque no haya ninguna; formatos,
+    planilla y colapsar_repetidas se aplican después, al unir los fragmentos
+    con unir_fragmentos. La caché, la cuarentena y el diario del fragmento
+    llevan el mismo sufijo, para que varios nodos compartan la carpeta.
+
+    Cada archivo terminado se anota en el diario de la salida
+    (<salida>.diario.jsonl). Si el lote se interrumpe, la siguiente ejecución
+    toma de allí los archivos ya terminados (sin cambios desde entonces) y
+    solo procesa el resto; el Excel resultante es el mismo que el de una
+    ejecución sin interrupciones. El diario se elimina al guardar la salida.
+
+    Con usar_cache solo se procesan los archivos nuevos o modificados desde la
+    última ejecución. max_paginas activa la lectura por páginas de procesar_pdf
+    y motor_texto elige el motor de la capa de texto (ver fichas.texto).
+    Con perfilar se miden los tiempos por etapa de cada archivo y se guardan
+    junto a la salida (<salida>.perfil.json y .csv).
+
+    Con precarga, hilos de lectura cargan por adelantado los siguientes PDFs
+    mientras se analizan los anteriores (útil en carpetas de red); al final
+    se informan las esperas de cada etapa y la ocupación de la cola.
+
+    Al final se informa qué campos quedaron vacíos o con un valor alternativo
+    (ver InformeCampos), y el estado de cada campo de cada archivo se guarda en
+    <salida>.campos.csv (los fragmentos lo dejan para unir_fragmentos). Con
+    reparar, los campos que falten se buscan con las estrategias más lentas
+    de fichas.reparacion; los archivos de la caché con
+    campos faltantes se reabren y sus filas completadas reemplazan las guardadas.
+
+    Con limite_segundos o limite_memoria_mb cada archivo se procesa aislado y
+    los que exceden el límite pasan a la cuarentena de la carpeta. Los
+    archivos en cuarentena se omiten, salvo con reintentar_cuarentena: entonces
+    se procesan en su lugar del recorrido, de a uno y siempre aislados (con los
+    límites por defecto si no se indicaron). Devuelve un ResumenLote; su atributo salida queda en None
+    si no se pudo procesar ningún archivo.
+    """
+    verificar_motor_texto(motor_texto)
+    if archivos is None:
+        archivos = recorrer_pdfs(carpeta, recursivo)
+    if fragmento:
+        indice_fragmento, total_fragmentos = fragmento
+        archivos = (a for a in archivos if fragmento_de(a, total_fragmentos) == indice_fragmento)
+    resumen = ResumenLote(0)
+
+    log(f"🔄 Iniciando procesamiento de {os.path.basename(os.path.normpath(carpeta))}"
+        + (" y sus subcarpetas..." if recursivo else "..."))
+    if workers > 1:
+        log(f"⚙️ Usando {workers} procesos en paralelo")
+    if limite_memoria_mb and not memoria_medible():
+        log("⚠️ El límite de memoria no está disponible en esta plataforma; solo se aplicará el de tiempo")
+    if limite_segundos or limite_memoria_mb:
+        log(f"🛡️ Archivos aislados: hasta {limite_segundos or '∞'} s y {limite_memoria_mb or '∞'} MB por archivo")
+    if max_paginas:
+        log(f"📑 Lectura por páginas: hasta {max_paginas} páginas antes de analizar el documento completo")
+    if motor_texto and motor_texto != MOTOR_POR_DEFECTO:
+        log(f"🔤 Capa de texto con {motor_texto}; pdfplumber solo para las tablas")
+    if reparar:
+        log("🩹 Reparación: se reabren los archivos con campos faltantes y se buscan con estrategias más lentas")
+    aislado = bool(limite_segundos or limite_memoria_mb)
+    canal = EstadisticasCanal(precarga, hilos_lectura) if precarga and not aislado else None
+    if precarga and aislado:
+        log("⚠️ La lectura anticipada no se usa con archivos aislados")
+    elif canal:
+        log(f"🚰 Lectura anticipada: hasta {precarga} archivos con {hilos_lectura} hilos")
+
+    # Las filas de la lectura por páginas o de otro motor de texto se guardan aparte
+    variante = "/".join(
+        ([f"p{max_paginas}"] if max_paginas else [])
+        + ([motor_texto] if motor_texto and motor_texto != MOTOR_POR_DEFECTO else [])
+    )
+
+    # Las filas se escriben a medida que terminan, en el orden en que se encontraron los archivos
+    salida = salida or os.path.join(carpeta, NOMBRE_SALIDA)
+    nombre_cache, nombre_cuarentena = NOMBRE_CACHE, NOMBRE_CUARENTENA
+    if fragmento:
+        log(f"🧩 Fragmento {indice_fragmento} de {total_fragmentos}: solo los archivos que le corresponden")
+        nombre_cache = nombre_fragmento(NOMBRE_CACHE, indice_fragmento, total_fragmentos)
+        nombre_cuarentena = nombre_fragmento(NOMBRE_CUARENTENA, indice_fragmento, total_fragmentos)
+        salida = ruta_fragmento(salida, indice_fragmento, total_fragmentos)
+        escritores = [EscritorFragmento(salida, indice_fragmento, total_fragmentos, variante)]
+    else:
+        escritores = [ESCRITORES[formato](ruta_formato(salida, formato), anexar=anexar) for formato in formatos]
+        if planilla:
+            escritores.append(EscritorPlanilla(planilla, hoja_planilla, clave_planilla))
+    escritor = EscritorSalidas(escritores, ruta_parcial(salida))
+    informe = InformePerfil() if perfilar else None
+    escribir = informe.envolver_escritura(escritor.escribir) if informe else escritor.escribir
+    colapsador = ColapsadorFilas(escribir) if colapsar_repetidas and not fragmento else None
+    campos = InformeCampos(
+        escritor=None if fragmento else EscritorCampos(ruta_campos(salida), anexar=anexar)
+    )
+    ordenador = OrdenadorFilas(campos.envolver(colapsador or escribir))
+    archivos_pdf = []
+    completados = 0
+    # Copias de un archivo todavía en proceso y resultado de cada archivo ya
+    # procesado (la FilaFicha, unos 170 B, o el error), por si aparece una copia
+    detector = DetectorDuplicados()
+    copias = {}
+    resultados = {}
+
+    cache = abrir_cache(carpeta, log, variante, nombre_cache) if usar_cache else None
+    # Un diario sin reparar no sirve para reanudar una reparación (ni al revés)
+    diario = abrir_diario(salida, log, "/".join(filter(None, [variante, "reparar" if reparar else ""])))
+    if diario and diario.entradas:
+        log(f"♻️ Reanudando el lote anterior: {len(diario.entradas)} archivos ya terminados")
+    cuarentena = Cuarentena(os.path.join(carpeta, nombre_cuarentena))
+
+    def avanzar(archivo=None):
+        nonlocal completados
+        completados += 1
+        if progreso:
+            progreso(completados, resumen.total, archivo)
+
+    def por_procesar(indices):
+        """Rutas a procesar a medida que se encuentran; las filas en caché se
+        escriben sin procesar y los archivos en cuarentena se omiten (o se
+        reintentan ahí mismo, aislados)"""
+        for archivo in archivos:
+            i = len(archivos_pdf)
+            archivos_pdf.append(archivo)
+            resumen.total += 1
+            ruta_pdf = os.path.join(carpeta, archivo)
+            registrado = diario.buscar(archivo, ruta_pdf) if diario else None
+            if registrado is not None:
+                fila, error = registrado
+                resumen.reanudados += 1
+                if error is None:
+                    resumen.procesados += 1
+                else:
+                    resumen.con_error += 1
+                    resumen.archivos_con_error.append(archivo)
+                ordenador.agregar(i, fila, archivo)
+                avanzar()
+                continue
+            if cache:
+                try:
+                    fila = cache.buscar(archivo, ruta_pdf)
+                except Exception:
+                    fila = None
+                if fila is not None and reparar and fila.faltantes():
+                    resumen.reabiertos += 1
+                elif fila is not None:
+                    resumen.procesados += 1
+                    ordenador.agregar(i, fila, archivo)
+                    avanzar()
+                    continue
+            motivo = cuarentena.motivo(archivo, ruta_pdf)
+            if motivo is not None:
+                if reintentar_cuarentena:
+                    # Aislado y sin esperar al pool: su fila no demora a las siguientes
+                    log(f"🚧 Reintentando {archivo} (en cuarentena: {motivo})")
+                    resumen.reintentados += 1
+                    procesar(
+                        [ruta_pdf], [i],
+                        limite_segundos or LIMITE_SEGUNDOS, limite_memoria_mb or LIMITE_MEMORIA_MB, 1
+                    )
+                else:
+                    log(f"🚧 {archivo} en cuarentena ({motivo}), se omite")
+                    resumen.en_cuarentena += 1
+                    ordenador.agregar(i, None)
+                    avanzar()
+                continue
+            original = detector.original(i, ruta_pdf, cache.hash_pendiente(archivo) if cache else None)
+            if original in resultados:
+                resultado = resultados[original]
+                if isinstance(resultado, BaseException):
+                    resolver(i, None, resultado, original=original)
+                else:
+                    resolver(i, resultado, None, original=original)
+                continue
+            if original is not None:
+                copias.setdefault(original, []).append(i)
+                continue
+            indices.append(i)
+            yield ruta_pdf
+
+    def resolver(i, fila, error, perfil=None, original=None):
+        """Registrar el resultado del archivo i (o de la copia de original) y el de sus copias pendientes"""
+        archivo = archivos_pdf[i]
+        ruta_pdf = os.path.join(carpeta, archivo)
+        if diario:
+            diario.registrar(archivo, ruta_pdf, fila, error)
+        if original is not None:
+            resumen.repetidos += 1
+            log(f"👯 {archivo} es idéntico a {archivos_pdf[original]}, se reutiliza su resultado")
+        if error is None:
+            resumen.procesados += 1
+            cuarentena.quitar(archivo)
+            if informe and perfil:
+                informe.agregar(perfil)
+            if cache:
+                cache.guardar(archivo, ruta_pdf, fila)
+            if original is None:
+                log(f"✅ {archivo} procesado correctamente")
+        else:
+            resumen.con_error += 1
+            resumen.archivos_con_error.append(archivo)
+            if isinstance(error, LimiteExcedido):
+                cuarentena.agregar(archivo, ruta_pdf, str(error))
+                log(f"🚧 {archivo} {str(error)}; se terminó su proceso y pasa a cuarentena")
+            else:
+                log(f"❌ Error procesando {archivo}: {str(error)}")
+        ordenador.agregar(i, fila, archivo)
+        avanzar(archivo)
+        if original is None:
+            # Sin la traza, que retiene los marcos de la excepción
+            resultados[i] = fila if error is None else error.with_traceback(None)
+            for copia in copias.pop(i, ()):
+                resolver(copia, fila, error, original=i)
+
+    def procesar(rutas, indices, segundos, memoria_mb, workers=workers):
+        for j, _, fila, error, perfil in procesar_lote(
+                rutas, workers, max_paginas, perfilar, segundos, memoria_mb, motor_texto,
+                precarga if canal else None, hilos_lectura, canal, reparar):
+            resolver(indices[j], fila, error, perfil)
+
+    try:
+        indices = []
+        procesar(por_procesar(indices), indices, limite_segundos, limite_memoria_mb)
+        if resumen.reanudados:
+            log(f"♻️ {resumen.reanudados} archivos tomados del diario de avance")
+        if resumen.repetidos:
+            log(f"👯 {resumen.repetidos} archivos idénticos a otro del lote, procesados una sola vez")
+        if cache:
+            # Los reabiertos se encontraron en la caché pero su fila no se usó
+            resumen.aciertos_cache = cache.aciertos - resumen.reabiertos
+            resumen.fallos_cache = cache.fallos
+            log(f"🗃️ Caché: {resumen.aciertos_cache} sin cambios, {cache.fallos} nuevos o modificados")
+        if resumen.reabiertos:
+            log(f"🩹 {resumen.reabiertos} archivos de la caché con campos faltantes reabiertos")
+        if resumen.reintentados:
+            log(f"🚧 {resumen.reintentados} archivos en cuarentena reintentados")
+    except BaseException:
+        if diario:
+            diario.cerrar()
+        escritor.abortar()
+        campos.abortar()
+        if escritor.filas:
+            log(f"⚠️ Procesamiento interrumpido: {escritor.filas} filas conservadas en "
+                f"{os.path.basename(escritor.ruta_parcial)}")
+        raise
+    finally:
+        if cache:
+            cache.cerrar()
+        try:
+            cuarentena.guardar()
+        except OSError as e:
+            log(f"⚠️ No se pudo guardar la lista de cuarentena: {str(e)}")
+
+    if resumen.total == 0 and not fragmento:
+        if diario:
+            diario.cerrar(eliminar=True)
+        log("❌ No se encontraron archivos PDF")
+        return resumen
+
+    # Guardar resultados; el lote ya no necesita el diario
+    inicio = time.perf_counter()
+    resumen.salidas = escritor.cerrar()
+    ruta_estado = campos.cerrar()
+    resumen.salida = resumen.salidas[0] if resumen.salidas else None
+    if diario:
+        diario.cerrar(eliminar=True)
+    if resumen.salida:
+        for e in escritor.escritores:
+            if isinstance(e, EscritorPlanilla):
+                log(f"📒 Planilla maestra actualizada: {os.path.basename(e.salida)} "
+                    f"({e.agregadas} filas nuevas, {e.actualizadas} actualizadas)")
+            elif isinstance(e, EscritorFragmento):
+                log(f"🧩 Fragmento {indice_fragmento} de {total_fragmentos} guardado: "
+                    f"{os.path.basename(e.salida)} ({e.filas} filas)")
+            else:
+                log(f"💾 Archivo {NOMBRES_FORMATO[e.formato]} {'actualizado' if anexar else 'guardado'}: "
+                    f"{os.path.basename(e.salida)}")
+        log(f"📊 Resumen: {resumen.procesados} exitosos, {resumen.con_error} con errores")
+        if colapsador and colapsador.omitidas:
+            resumen.filas_colapsadas = colapsador.omitidas
+            log(f"🧹 {colapsador.omitidas} filas repetidas (mismo código, cédula y fecha de inicio) omitidas")
+        for linea in escritor.costos():
+            log(linea)
+        if canal:
+            for linea in canal.resumen():
+                log(linea)
+        if cuarentena.entradas:
+            log(f"🚧 {len(cuarentena.entradas)} archivos en cuarentena ({nombre_cuarentena})")
+        resumen.con_faltantes = campos.con_faltantes
+        for linea in campos.resumen(reparado=reparar):
+            log(linea)
+        if ruta_estado:
+            log(f"🔎 Estado de los campos por archivo: {os.path.basename(ruta_estado)}")
+        if informe:
+            informe.escritura += time.perf_counter() - inicio
+            for linea in informe.resumen():
+                log(linea)
+            ruta_json, ruta_csv = informe.guardar(resumen.salida)
+            log(f"📈 Informe de tiempos: {os.path.basename(ruta_json)}, {os.path.basename(ruta_csv)}")
+    else:
+        log("❌ No se pudo procesar ningún archivo")
+    return resumen
+
+
+def vigilar_lote(carpeta, intervalo=INTERVALO_VIGILANCIA, recursivo=False, log=print, detener=None,
+                 **opciones):
+    """Procesar la carpeta y luego, cada intervalo segundos, solo los PDFs que
+    lleguen, agregando sus filas al resultado existente.
+
+    Los directorios sin cambios no se vuelven a leer (ver VigilanteCarpeta) y
+    los archivos con error se reintentan cuando cambian.
+    opciones se pasan a ejecutar_lote. Termina cuando se activa detener (un
+    threading.Event) o con Ctrl+C; devuelve el ResumenLote de la última pasada.
+    """
+    detener = detener or threading.Event()
+    vigilante = VigilanteCarpeta(carpeta, recursivo)
+    resumen = ejecutar_lote(carpeta, log=log, recursivo=recursivo, archivos=vigilante.nuevos(), **opciones)
+    for archivo in resumen.archivos_con_error:
+        vigilante.volver_a_entregar(archivo)
+    log(f"👀 Vigilando la carpeta cada {intervalo:g} s (Ctrl+C para terminar)")
+    try:
+        while not detener.wait(intervalo):
+            nuevos = list(vigilante.nuevos())
+            if not nuevos:
+                continue
+            log(f"📥 {len(nuevos)} archivos nuevos")
+            # Si todavía no hay Excel (ninguna fila antes), la pasada lo crea
+            resumen = ejecutar_lote(carpeta, log=log, recursivo=recursivo, archivos=nuevos,
+                                    anexar=True, **opciones)
+            for archivo in resumen.archivos_con_error:
+                vigilante.volver_a_entregar(archivo)
+    except KeyboardInterrupt:
+        log("👋 Vigilancia terminada")
+    return resumen
@@ -0,0 +1,181 @@
+"""Medición opcional de tiempos por etapa y del pico de memoria del análisis de cada ficha."""
+import csv
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager, nullcontext
+
+ETAPAS = ["abrir", "texto", "tablas", "regex"]
+
+_SIN_PERFIL = nullcontext()
+
+
+def medir(perfil, etapa):
+    """Contexto que suma la duración del bloque a la etapa del perfil (si hay perfil)"""
+    return perfil.etapa(etapa) if perfil is not None else _SIN_PERFIL
+
+
+def reiniciar_pico_memoria() -> bool:
+    """Reiniciar el pico de memoria residente del proceso (Linux: /proc/self/clear_refs).
+
+    Devuelve False si la plataforma no lo permite; entonces el pico de un
+    archivo no se puede separar del de los anteriores del mismo proceso.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def pico_memoria_mb():
+    """Pico de memoria residente (MB) desde el último reinicio; None si no se puede leer"""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class PerfilArchivo:
+    """Tiempos (s) por etapa, páginas y tablas de un archivo"""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.tiempos = dict.fromkeys(ETAPAS, 0.0)
+        self.total = 0.0
+        self.paginas = 0
+        self.tablas = 0
+        # Tablas interpretadas con un diseño ya conocido (ver DisenosTabla)
+        self.disenos_reutilizados = 0
+        # Análisis de página repetidos: texto o tablas calculados más de una vez (debe ser 0)
+        self.analisis_repetidos = 0
+        # Cuánto superó el pico de memoria residente durante el archivo a la
+        # memoria del proceso al empezarlo (MB)
+        self.memoria_mb = None
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tiempos[nombre] += time.perf_counter() - inicio
+
+    def como_dict(self) -> dict:
+        return {
+            "archivo": self.archivo,
+            "total": round(self.total, 6),
+            **{etapa: round(segundos, 6) for etapa, segundos in self.tiempos.items()},
+            "num_paginas": self.paginas,
+            "num_tablas": self.tablas,
+            "disenos_reutilizados": self.disenos_reutilizados,
+            "memoria_mb": round(self.memoria_mb, 1) if self.memoria_mb is not None else None,
+        }
+
+
+class InformePerfil:
+    """Acumula los perfiles de un lote y genera el resumen y el informe"""
+
+    def __init__(self):
+        self.archivos = []
+        self.escritura = 0.0
+
+    def agregar(self, perfil):
+        self.archivos.append(perfil)
+
+    def envolver_escritura(self, escribir):
+        """Devolver escribir midiendo el tiempo acumulado de escritura"""
+        def escribir_medido(fila, archivo=None):
+            inicio = time.perf_counter()
+            escribir(fila, archivo)
+            self.escritura += time.perf_counter() - inicio
+        return escribir_medido
+
+    def totales(self) -> dict:
+        totales = {etapa: sum(p.tiempos[etapa] for p in self.archivos) for etapa in ETAPAS}
+        totales["escritura"] = self.escritura
+        return totales
+
+    def mas_lentos(self, n=10):
+        return sorted(self.archivos, key=lambda p: p.total, reverse=True)[:n]
+
+    def memoria(self):
+        """(mediana, máximo, perfil del máximo) de la memoria sumada por archivo; None si no se midió"""
+        medidos = [p for p in self.archivos if p.memoria_mb is not None]
+        if not medidos:
+            return None
+        mayor = max(medidos, key=lambda p: p.memoria_mb)
+        return statistics.median(p.memoria_mb for p in medidos), mayor.memoria_mb, mayor
+
+    def resumen(self, n_lentos=5):
+        """Líneas para el registro de actividad"""
+        if not self.archivos:
+            return []
+        totales = self.totales()
+        suma = sum(totales.values()) or 1
+        lineas = [f"⏱️ Tiempos por etapa ({len(self.archivos)} archivos analizados):"]
+        for etapa, segundos in totales.items():
+            lineas.append(
+                f"   {etapa}: {segundos:.2f} s ({segundos / suma:.0%}), "
+                f"{segundos / len(self.archivos) * 1000:.1f} ms/archivo"
+            )
+        lineas.append("🐢 Archivos más lentos:")
+        for p in self.mas_lentos(n_lentos):
+            lineas.append(f"   {p.archivo}: {p.total:.2f} s ({p.paginas} páginas, {p.tablas} tablas)")
+        tablas = sum(p.tablas for p in self.archivos)
+        if tablas:
+            reutilizados = sum(p.disenos_reutilizados for p in self.archivos)
+            lineas.append(
+                f"📐 Diseños de tabla reutilizados: {reutilizados} de {tablas} tablas ({reutilizados / tablas:.0%})"
+            )
+        repetidos = sum(p.analisis_repetidos for p in self.archivos)
+        if repetidos:
+            lineas.append(f"⚠️ Páginas analizadas más de una vez: {repetidos}")
+        memoria = self.memoria()
+        if memoria:
+            mediana, maximo, mayor = memoria
+            lineas.append(
+                f"🧠 Memoria sumada por archivo (pico sobre la del proceso al empezarlo): mediana {mediana:.1f} MB, "
+                f"máximo {maximo:.1f} MB en {mayor.archivo} ({mayor.paginas} páginas)"
+            )
+        return lineas
+
+    def guardar(self, salida):
+        """Escribir <salida>.perfil.json (resumen y detalle) y <salida>.perfil.csv
+        (una fila por archivo); devuelve las dos rutas"""
+        base = os.path.splitext(salida)[0]
+        ruta_json = base + ".perfil.json"
+        ruta_csv = base + ".perfil.csv"
+        por_archivo = [p.como_dict() for p in self.archivos]
+
+        totales = self.totales()
+        memoria = self.memoria()
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump({
+                "archivos": len(self.archivos),
+                "totales": {etapa: round(s, 6) for etapa, s in totales.items()},
+                "promedios": {
+                    etapa: round(s / len(self.archivos), 6) if self.archivos else 0.0
+                    for etapa, s in totales.items()
+                },
+                "num_paginas": sum(p.paginas for p in self.archivos),
+                "num_tablas": sum(p.tablas for p in self.archivos),
+                "disenos_reutilizados": sum(p.disenos_reutilizados for p in self.archivos),
+                "memoria_mb": {
+                    "mediana": round(memoria[0], 1), "maximo": round(memoria[1], 1)
+                } if memoria else None,
+                "mas_lentos": [p.como_dict() for p in self.mas_lentos()],
+                "por_archivo": por_archivo,
+            }, f, ensure_ascii=False, indent=2)
+
+        with open(ruta_csv, "w", newline="", encoding="utf-8-sig") as f:
+            escritor = csv.DictWriter(f, fieldnames=["archivo", "total", *ETAPAS, "num_paginas", "num_tablas", "disenos_reutilizados", "memoria_mb"])
+            escritor.writeheader()
+            escritor.writerows(por_archivo)
+        return ruta_json, ruta_csv
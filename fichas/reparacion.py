@@ -0,0 +1,231 @@
+"""Estado de los campos de cada fila y búsqueda más exhaustiva de los que faltan.
+
+El análisis normal está afinado para la plantilla habitual: expresiones
+exactas sobre el texto y tablas solo en las páginas con palabras clave. Si
+una ficha se aparta de ella (tildes, fechas con barras, la tabla de días
+con el encabezado más abajo) algún campo queda vacío. InformeCampos resume
+al final del lote qué campos faltan y en cuántos archivos; con reparar
+(extraer --reparar) esos archivos se reabren, también los que vienen de la
+caché, y completar_faltantes busca solo los campos vacíos con estrategias
+más lentas:
+
+* expresiones más flexibles sobre el texto de todas las páginas y, si aún
+  faltan, sobre el texto con la disposición de la página (layout=True);
+* las tablas de todas las páginas, con la detección por líneas y por
+  alineación del texto, y el encabezado LU..DO en cualquier fila.
+
+Los valores encontrados así quedan marcados como alternativos.
+"""
+import re
+
+from .extraccion import (
+    COLUMNAS,
+    DIAS_SEMANA,
+    FilaFicha,
+    TablaFicha,
+    formatear_cedula,
+    formatear_fecha,
+    safe_extract_text,
+)
+
+# Columnas de los días y nombre con el que se informan (un solo campo)
+_COLUMNAS_DIAS = tuple(DIAS_SEMANA.values())
+CAMPO_DIAS = "S..Y"
+
+# Estrategias adicionales de detección de tablas (la de pdfplumber por defecto ya se usó)
+_AJUSTES_EXHAUSTIVOS = [None, {"vertical_strategy": "text", "horizontal_strategy": "text"}]
+
+_FECHA = r"[^0-9\n]{0,20}?(\d{1,2})\s*[/\-\.\s]\s*(\d{1,2})\s*[/\-\.\s]\s*(?:20)?(\d{2})(?!\d)"
+# Tras la etiqueta: ":" o "-" y el valor en la misma línea, o el valor en la línea siguiente
+_VALOR_LINEA = r"(?:[ \t]*[:\-][ \t]*|[ \t]*[:\-]?[ \t]*\r?\n\s*)([^\n\r]*[^\s:\-][^\n\r]*)"
+
+# Expresiones flexibles por columna, en orden de preferencia
+PATRONES_RELAJADOS = {
+    "D": [r"c[oó]d(?:igo|\.)(?:\s+del)?(?:\s+programa|\s+ficha)?(?:\s+o\s+EDT)?[^0-9\n]{0,20}([0-9]{4,})"],
+    "I": [
+        r"c[eé]dul[ao](?:\s+de\s+ciudadan[ií]a)?[^0-9\n]{0,20}([0-9][0-9\., ]{4,14}[0-9])",
+        r"(?:documento(?:\s+de\s+identidad)?|identificaci[oó]n|\bC\.\s?C\.)[^0-9\n]{0,20}([0-9][0-9\., ]{4,14}[0-9])",
+    ],
+    "N": [r"(?:fecha\s+)?de\s+inicio" + _FECHA],
+    "O": [r"(?:fecha\s+)?de\s+(?:finalizaci[oó]n|terminaci[oó]n)" + _FECHA],
+    "P": [r"\bmunicipio\b" + _VALOR_LINEA, r"\bciudad\b" + _VALOR_LINEA],
+    "Q": [r"\blugar(?:\s+donde\s+se\s+dicta)?\b" + _VALOR_LINEA, r"\bvereda\b" + _VALOR_LINEA],
+    "R": [r"horario[^0-9\n]{0,30}?(\d{1,2})(?::\d{2})?\s*(?:[ap]\.?\s*m\.?)?\s*(?:a|-|hasta)\s*(\d{1,2})"],
+    "Z": [r"cupo(?:\s+de\s+aprendices|\s+m[aá]ximo)?[^0-9\n]{0,20}(\d+)"],
+}
+_PATRONES = {
+    col: [re.compile(patron, re.I) for patron in patrones] for col, patrones in PATRONES_RELAJADOS.items()
+}
+
+
+def campos_faltantes(fila) -> list:
+    """Campos vacíos de la fila, con los días como un solo campo (S..Y)"""
+    faltan = fila.faltantes()
+    if _COLUMNAS_DIAS[0] in faltan:
+        faltan = [col for col in faltan if col not in _COLUMNAS_DIAS] + [CAMPO_DIAS]
+    return faltan
+
+
+def _valor(col, m):
+    if col == "I":
+        return formatear_cedula(m.group(1))
+    if col in ("N", "O"):
+        if not (1 <= int(m.group(1)) <= 31 and 1 <= int(m.group(2)) <= 12):
+            return ""
+        return formatear_fecha(m.group(1), m.group(2), m.group(3))
+    if col == "R":
+        return f"{int(m.group(1))} A {int(m.group(2))}"
+    if col == "Z":
+        return int(m.group(1))
+    return m.group(1).strip()
+
+
+def buscar_relajado(col, texto):
+    """Valor de la columna con las expresiones flexibles; "" si no aparece"""
+    for patron in _PATRONES[col]:
+        for m in patron.finditer(texto):
+            valor = _valor(col, m)
+            if valor != "":
+                return valor
+    return ""
+
+
+def _tablas_exhaustivas(doc):
+    """TablaFicha de todas las tablas de todas las páginas, con cada estrategia de detección"""
+    for idx in doc.indices():
+        pagina = doc.paginas[idx]
+        for ajustes in _AJUSTES_EXHAUSTIVOS:
+            for filas in pagina.extract_tables(ajustes):
+                yield TablaFicha(filas)
+        doc.liberar_pagina(idx)
+
+
+def _dias_con_encabezado(filas) -> set:
+    """Columnas S..Y con horas bajo un encabezado LU..DO en cualquier fila de la tabla"""
+    marcados = set()
+    for row_idx, row in enumerate(filas):
+        encabezado = [str(cell or "").strip().upper() for cell in row or []]
+        if not set(DIAS_SEMANA).issubset(encabezado):
+            continue
+        columnas = {dia: encabezado.index(dia) for dia in DIAS_SEMANA}
+        for datos in filas[row_idx + 1:]:
+            for dia, col_letter in DIAS_SEMANA.items():
+                if datos and len(datos) > columnas[dia] and str(datos[columnas[dia]] or "").strip().isdigit():
+                    marcados.add(col_letter)
+    return marcados
+
+
+def completar_faltantes(doc, fila) -> FilaFicha:
+    """Fila con los campos vacíos buscados de nuevo en el documento ya abierto;
+    los que se encuentran quedan como alternativos"""
+    valores = fila.como_dict()
+    alternativos = set(fila.alternativos)
+    pendientes = [col for col in campos_faltantes(fila) if col != CAMPO_DIAS]
+    faltan_dias = CAMPO_DIAS in campos_faltantes(fila)
+
+    def anotar(col, valor):
+        valores[col] = valor
+        alternativos.add(col)
+        pendientes.remove(col)
+
+    textos = (
+        lambda: safe_extract_text(doc),
+        lambda: "\n".join(doc.paginas[idx].extract_text(layout=True) or "" for idx in doc.indices()),
+    )
+    for obtener_texto in textos:
+        if not pendientes:
+            break
+        texto = obtener_texto()
+        for col in list(pendientes):
+            valor = buscar_relajado(col, texto)
+            if valor != "":
+                anotar(col, valor)
+
+    if "R" in pendientes or faltan_dias:
+        horarios = []
+        dias = set()
+        for tabla in _tablas_exhaustivas(doc):
+            horarios.extend(tabla.horarios)
+            dias.update(tabla.dias_marcados, _dias_con_encabezado(tabla.filas))
+        if "R" in pendientes and horarios:
+            desde, hasta = max(horarios, key=lambda x: x[1] - x[0])
+            anotar("R", f"{desde} A {hasta}")
+        if faltan_dias and dias:
+            for col in dias:
+                valores[col] = "X"
+            alternativos.update(_COLUMNAS_DIAS)
+
+    return FilaFicha(
+        *(valores[col] for col in COLUMNAS),
+        alternativos=tuple(col for col in COLUMNAS if col in alternativos),
+    )
+
+
+class InformeCampos:
+    """Cuenta, por campo, los archivos con el campo faltante o alternativo.
+
+    Con escritor (un EscritorCampos) además se escribe el estado de cada
+    campo de cada archivo a medida que llegan las filas.
+    """
+
+    def __init__(self, max_listados=10, escritor=None):
+        self.max_listados = max_listados
+        self.escritor = escritor
+        self.filas = 0
+        self.faltantes = {}
+        self.alternativos = {}
+        self.incompletos = []  # (archivo, campos faltantes)
+        self.con_faltantes = 0
+
+    def agregar(self, fila, archivo=None):
+        self.filas += 1
+        if self.escritor is not None:
+            self.escritor.escribir(fila, archivo)
+        faltan = campos_faltantes(fila)
+        for campo in faltan:
+            self.faltantes[campo] = self.faltantes.get(campo, 0) + 1
+        alternativos = [col for col in fila.alternativos if col not in _COLUMNAS_DIAS]
+        if any(col in _COLUMNAS_DIAS for col in fila.alternativos):
+            alternativos.append(CAMPO_DIAS)
+        for campo in alternativos:
+            self.alternativos[campo] = self.alternativos.get(campo, 0) + 1
+        if faltan:
+            self.con_faltantes += 1
+            if len(self.incompletos) < self.max_listados:
+                self.incompletos.append((archivo, faltan))
+
+    def envolver(self, escribir):
+        """Devolver escribir registrando antes cada fila en el informe"""
+        def escribir_registrando(fila, archivo=None):
+            self.agregar(fila, archivo)
+            escribir(fila, archivo)
+        return escribir_registrando
+
+    def cerrar(self):
+        """Guardar el informe por archivo; devuelve su ruta o None"""
+        return self.escritor.cerrar() if self.escritor is not None else None
+
+    def abortar(self):
+        if self.escritor is not None:
+            self.escritor.abortar()
+
+    @staticmethod
+    def _conteos(conteos):
+        orden = [col for col in COLUMNAS if col not in _COLUMNAS_DIAS] + [CAMPO_DIAS]
+        return ", ".join(f"{campo} {conteos[campo]}" for campo in sorted(conteos, key=orden.index))
+
+    def resumen(self, reparado=False) -> list:
+        """Líneas para el registro de actividad"""
+        lineas = []
+        if self.alternativos:
+            lineas.append(f"↪️ Campos con valor alternativo (archivos): {self._conteos(self.alternativos)}")
+        if self.con_faltantes:
+            lineas.append(
+                f"🔎 Campos faltantes en {self.con_faltantes} de {self.filas} archivos: {self._conteos(self.faltantes)}"
+                + ("" if reparado else " (use --reparar para buscarlos con estrategias más lentas)")
+            )
+            for archivo, faltan in self.incompletos:
+                lineas.append(f"   {archivo}: {', '.join(faltan)}")
+            if self.con_faltantes > len(self.incompletos):
+                lineas.append(f"   ... y {self.con_faltantes - len(self.incompletos)} más")
+        return lineas
@@ -0,0 +1,543 @@
+"""Escritura incremental del resultado: las filas llegan a disco a medida que se producen.
+
+Hay un escritor por formato (xlsx, csv, parquet, jsonl) y uno que actualiza
+una planilla maestra existente en las columnas D..Z. EscritorSalidas
+reparte cada fila entre los escritores elegidos, mide el costo de cada uno
+y mantiene el CSV parcial que sobrevive a una interrupción.
+"""
+import csv
+import json
+import os
+import time
+from array import array
+
+from .extraccion import COLUMNAS, DIAS_SEMANA
+
+
+# Nombre de cada formato de salida en el registro de actividad
+NOMBRES_FORMATO = {"xlsx": "Excel", "csv": "CSV", "parquet": "Parquet", "jsonl": "JSON Lines"}
+
+
+def ruta_parcial(salida):
+    """CSV que acompaña a la salida mientras el lote está en curso"""
+    return os.path.splitext(salida)[0] + ".parcial.csv"
+
+
+def ruta_campos(salida):
+    """Informe por archivo del estado de cada campo que acompaña a la salida"""
+    return os.path.splitext(salida)[0] + ".campos.csv"
+
+
+def ruta_formato(salida, formato):
+    """Ruta de la salida con la extensión del formato"""
+    return os.path.splitext(salida)[0] + "." + formato
+
+
+class EscritorExcel:
+    """Escribe el Excel con openpyxl en modo write-only (memoria constante).
+
+    El libro se crea con la primera fila (un lote sin filas no deja salida)
+    y al cerrar se guarda, reemplazando el anterior solo cuando está completo.
+    Con anexar, las filas del Excel existente se copian antes de las nuevas.
+    """
+
+    formato = "xlsx"
+
+    def __init__(self, salida, hoja="Sheet1", anexar=False):
+        # Importar al crear el escritor: el costo medido de escritura no incluye la importación
+        from openpyxl import Workbook
+
+        self._libro_nuevo = Workbook
+        self.salida = salida
+        self.nombre_hoja = hoja
+        self.anexar = anexar
+        self.filas = 0
+        self.libro = None
+
+    def _abrir(self):
+        self.libro = self._libro_nuevo(write_only=True)
+        self.hoja = self.libro.create_sheet(title=self.nombre_hoja)
+        self.hoja.append(COLUMNAS)
+        if self.anexar and os.path.exists(self.salida):
+            self._copiar_existentes()
+
+    def _copiar_existentes(self):
+        from openpyxl import load_workbook
+
+        anterior = load_workbook(self.salida, read_only=True)
+        try:
+            hoja = anterior[self.nombre_hoja] if self.nombre_hoja in anterior.sheetnames else anterior.active
+            for valores in hoja.iter_rows(min_row=2, values_only=True):
+                self.hoja.append(valores)
+        finally:
+            anterior.close()
+
+    def escribir(self, fila, archivo=None):
+        if self.libro is None:
+            self._abrir()
+        self.hoja.append(fila.valores())
+        self.filas += 1
+
+    def cerrar(self):
+        """Guardar el Excel; devuelve su ruta o None si no se escribió ninguna fila"""
+        if self.libro is None:
+            return None
+        temporal = self.salida + ".tmp"
+        self.libro.save(temporal)
+        os.replace(temporal, self.salida)
+        return self.salida
+
+    def abortar(self):
+        """Descartar el libro en curso"""
+        if self.libro is not None:
+            self.hoja.close()
+
+
+class EscritorTexto:
+    """Base de los formatos de texto por líneas: escriben en <salida>.tmp y
+    lo renombran al cerrar; con anexar copian primero el archivo existente."""
+
+    formato = None
+
+    def __init__(self, salida, anexar=False):
+        self.salida = salida
+        self.anexar = anexar
+        self.filas = 0
+        self.archivo = None
+
+    def _abrir(self):
+        self.temporal = self.salida + ".tmp"
+        self.archivo = open(self.temporal, "w", newline="", encoding=self.codificacion)
+        if self.anexar and os.path.exists(self.salida):
+            with open(self.salida, newline="", encoding=self.codificacion) as anterior:
+                self._copiar_existentes(anterior)
+        else:
+            self._encabezado()
+
+    def _encabezado(self):
+        pass
+
+    def _copiar_existentes(self, anterior):
+        for linea in anterior:
+            self.archivo.write(linea)
+
+    def escribir(self, fila, archivo=None):
+        if self.archivo is None:
+            self._abrir()
+        self._escribir(fila)
+        self.filas += 1
+
+    def cerrar(self):
+        if self.archivo is None:
+            return None
+        self.archivo.close()
+        os.replace(self.temporal, self.salida)
+        return self.salida
+
+    def abortar(self):
+        if self.archivo is not None:
+            self.archivo.close()
+            os.remove(self.temporal)
+
+
+class EscritorCSV(EscritorTexto):
+    formato = "csv"
+    codificacion = "utf-8-sig"
+
+    def _abrir(self):
+        super()._abrir()
+        self._csv = csv.writer(self.archivo)
+
+    def _encabezado(self):
+        csv.writer(self.archivo).writerow(COLUMNAS)
+
+    def _escribir(self, fila):
+        self._csv.writerow(fila.valores())
+
+
+class EscritorCampos(EscritorCSV):
+    """Estado de cada columna por archivo (encontrado, alternativo o faltante,
+    ver FilaFicha.estado), una línea por fila escrita"""
+
+    formato = "campos"
+
+    def _encabezado(self):
+        csv.writer(self.archivo).writerow(["archivo", *COLUMNAS])
+
+    def escribir(self, fila, archivo=None):
+        if self.archivo is None:
+            self._abrir()
+        estado = fila.estado()
+        self._csv.writerow([archivo, *(estado[col] for col in COLUMNAS)])
+        self.filas += 1
+
+
+class EscritorJSONL(EscritorTexto):
+    """Una fila por línea como objeto JSON {"D": ..., ..., "Z": ...}"""
+
+    formato = "jsonl"
+    codificacion = "utf-8"
+
+    def _escribir(self, fila):
+        self.archivo.write(json.dumps(fila.como_dict(), ensure_ascii=False) + "\n")
+
+
+class ColumnasFichas:
+    """Filas D..Z acumuladas por columna, con un tipo por columna.
+
+    El cupo Z es un entero nulo (valores int64 y una máscara de nulos), el
+    programa especial H y el municipio P son categóricas (códigos y la lista
+    de categorías, que se repiten mucho) y los días S..Y son booleanos; el
+    resto de columnas son listas de texto. a_arrow() arma la tabla con esos
+    mismos tipos (diccionario para H y P, bool para S..Y, cupo nulo si falta).
+
+    Las filas llegan primero a un bloque de tuplas que se pasa a las columnas
+    de una vez cada BLOQUE filas: convertir columna por columna es mucho más
+    barato que repartir cada fila entre dieciséis columnas.
+    """
+
+    CATEGORICAS = ("H", "P")
+    BLOQUE = 1024
+
+    def __init__(self):
+        self.texto = {col: [] for col in COLUMNAS
+                      if col not in self.CATEGORICAS and col not in DIAS_SEMANA.values() and col != "Z"}
+        self.codigos = {col: array("i") for col in self.CATEGORICAS}
+        self.categorias = {col: {} for col in self.CATEGORICAS}
+        self.dias = {col: bytearray() for col in DIAS_SEMANA.values()}
+        self.cupo = array("q")
+        self.sin_cupo = bytearray()
+        self._bloque = []
+
+    def __len__(self):
+        return len(self.cupo) + len(self._bloque)
+
+    def agregar(self, fila):
+        self._bloque.append(fila.valores())
+        if len(self._bloque) >= self.BLOQUE:
+            self._compactar()
+
+    def _compactar(self):
+        if not self._bloque:
+            return
+        for col, valores in zip(COLUMNAS, zip(*self._bloque)):
+            if col in self.texto:
+                self.texto[col].extend(valores)
+            elif col in self.codigos:
+                categorias = self.categorias[col]
+                for valor in dict.fromkeys(valores):
+                    categorias.setdefault(valor, len(categorias))
+                self.codigos[col].extend(map(categorias.__getitem__, valores))
+            elif col in self.dias:
+                self.dias[col].extend(map("X".__eq__, valores))
+            else:
+                self.sin_cupo.extend([valor == "" for valor in valores])
+                self.cupo.extend([valor or 0 for valor in valores])
+        self._bloque = []
+
+    def a_arrow(self, esquema):
+        """pyarrow.Table con las columnas en el orden y los tipos del esquema"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        self._compactar()
+
+        def desde_buffer(tipo, valores):
+            return pa.Array.from_buffers(tipo, len(valores), [None, pa.py_buffer(valores)])
+
+        columnas = {}
+        for col in COLUMNAS:
+            if col in self.texto:
+                columnas[col] = pa.array(self.texto[col], pa.string())
+            elif col in self.codigos:
+                categorias = pa.array(list(self.categorias[col]), pa.string())
+                columnas[col] = pa.DictionaryArray.from_arrays(
+                    desde_buffer(pa.int32(), self.codigos[col]), categorias
+                )
+            elif col in self.dias:
+                columnas[col] = desde_buffer(pa.uint8(), self.dias[col]).cast(pa.bool_())
+            else:
+                sin_cupo = desde_buffer(pa.uint8(), self.sin_cupo).cast(pa.bool_())
+                columnas[col] = pc.if_else(sin_cupo, pa.scalar(None, pa.int64()), desde_buffer(pa.int64(), self.cupo))
+        return pa.table(columnas, schema=esquema)
+
+
+def esquema_parquet():
+    """Esquema de la salida Parquet: H y P como diccionario de texto, los días
+    S..Y como bool (marcado o no), Z (cupo) entera y nula si falta, y el
+    resto texto"""
+    import pyarrow as pa
+
+    def tipo(col):
+        if col in ColumnasFichas.CATEGORICAS:
+            return pa.dictionary(pa.int32(), pa.string())
+        if col in DIAS_SEMANA.values():
+            return pa.bool_()
+        if col == "Z":
+            return pa.int64()
+        return pa.string()
+
+    return pa.schema([(col, tipo(col)) for col in COLUMNAS])
+
+
+class EscritorParquet:
+    """Parquet con pyarrow (dependencia opcional), por grupos de filas
+    acumulados en ColumnasFichas, con los tipos de esquema_parquet().
+
+    Al anexar a un Parquet escrito con todas las columnas de texto (días "X"
+    o ""), sus filas se convierten a esos tipos.
+    """
+
+    formato = "parquet"
+    FILAS_POR_GRUPO = 5000
+
+    def __init__(self, salida, anexar=False):
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ImportError("La salida Parquet requiere pyarrow (pip install pyarrow)") from None
+        self.esquema = esquema_parquet()
+        # La primera tabla inicializa pyarrow (importa pandas): fuera del costo medido
+        self.esquema.empty_table()
+        self.salida = salida
+        self.anexar = anexar
+        self.filas = 0
+        self.escritor = None
+        self.pendientes = ColumnasFichas()
+
+    def _abrir(self):
+        import pyarrow.parquet as pq
+
+        self.temporal = self.salida + ".tmp"
+        self.escritor = pq.ParquetWriter(self.temporal, self.esquema)
+        if self.anexar and os.path.exists(self.salida):
+            anterior = pq.ParquetFile(self.salida)
+            for grupo in range(anterior.num_row_groups):
+                self.escritor.write_table(self._convertir(anterior.read_row_group(grupo)))
+
+    def _convertir(self, tabla):
+        """Tabla anterior con los tipos del esquema (los días de texto "X" pasan a bool)"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        columnas = []
+        for campo in self.esquema:
+            columna = tabla.column(campo.name)
+            if pa.types.is_boolean(campo.type) and not pa.types.is_boolean(columna.type):
+                columna = pc.equal(columna, "X")
+            columnas.append(columna.cast(campo.type))
+        return pa.table(columnas, schema=self.esquema)
+
+    def _volcar(self):
+        if self.escritor is None:
+            self._abrir()
+        self.escritor.write_table(self.pendientes.a_arrow(self.esquema))
+        self.pendientes = ColumnasFichas()
+
+    def escribir(self, fila, archivo=None):
+        self.pendientes.agregar(fila)
+        self.filas += 1
+        if len(self.pendientes) >= self.FILAS_POR_GRUPO:
+            self._volcar()
+
+    def cerrar(self):
+        if self.pendientes:
+            self._volcar()
+        if self.escritor is None:
+            return None
+        self.escritor.close()
+        os.replace(self.temporal, self.salida)
+        return self.salida
+
+    def abortar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            os.remove(self.temporal)
+
+
+class EscritorPlanilla:
+    """Actualiza una planilla maestra existente escribiendo en sus columnas D..Z.
+
+    Las filas se deduplican por código del programa (columna D) o por
+    archivo (guardado en columna_archivo): si la clave ya está en la hoja,
+    se sobrescriben las columnas D..Z de esa fila; si no (o si la fila no
+    tiene código), se agrega al final.
+    El resto de columnas y hojas, con sus valores, fórmulas y formatos de
+    celda, se conservan; lo que openpyxl no lee se pierde al guardar
+    (gráficos, imágenes, tablas dinámicas y parte del formato condicional).
+    El libro se guarda una sola vez al cerrar (mediante un temporal, como
+    los demás formatos); si el lote se interrumpe la planilla no se modifica.
+    """
+
+    formato = "planilla"
+    CLAVES = ("codigo", "archivo")
+
+    def __init__(self, ruta, hoja=None, clave="codigo", columna_archivo="AA", fila_inicial=2):
+        if clave not in self.CLAVES:
+            raise ValueError(f"Clave de planilla no válida: {clave}")
+        self.salida = ruta
+        self.nombre_hoja = hoja
+        self.clave = clave
+        self.columna_archivo = columna_archivo
+        self.fila_inicial = fila_inicial
+        self.filas = 0
+        self.agregadas = 0
+        self.actualizadas = 0
+        self.libro = None
+
+    def _abrir(self):
+        from openpyxl import load_workbook
+
+        self.libro = load_workbook(self.salida, keep_vba=self.salida.lower().endswith(".xlsm"))
+        self.hoja = self.libro[self.nombre_hoja] if self.nombre_hoja else self.libro.active
+        columna = "D" if self.clave == "codigo" else self.columna_archivo
+        self.indice = {}
+        ultima = self.fila_inicial - 1
+        for (celda,) in self.hoja.iter_rows(min_row=self.fila_inicial, min_col=self._numero(columna),
+                                            max_col=self._numero(columna)):
+            if celda.value not in (None, ""):
+                self.indice.setdefault(self._clave(celda.value), celda.row)
+        for fila in self.hoja.iter_rows(min_row=self.fila_inicial):
+            if any(celda.value not in (None, "") for celda in fila):
+                ultima = fila[0].row
+        self.siguiente = ultima + 1
+
+    @staticmethod
+    def _clave(valor):
+        # Los códigos pueden venir como número en la planilla (228106 o 228106.0)
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)
+        return str(valor).strip()
+
+    @staticmethod
+    def _numero(columna):
+        from openpyxl.utils import column_index_from_string
+
+        return column_index_from_string(columna)
+
+    def escribir(self, fila, archivo=None):
+        if self.libro is None:
+            self._abrir()
+        clave = self._clave(fila["D"]) if self.clave == "codigo" else archivo
+        numero = self.indice.get(clave) if clave else None
+        if numero is None:
+            numero = self.siguiente
+            self.siguiente += 1
+            self.agregadas += 1
+            if clave:
+                self.indice[clave] = numero
+        else:
+            self.actualizadas += 1
+        for col in COLUMNAS:
+            valor = fila[col]
+            self.hoja[f"{col}{numero}"] = valor if valor != "" else None
+        if self.clave == "archivo" and archivo:
+            self.hoja[f"{self.columna_archivo}{numero}"] = archivo
+        self.filas += 1
+
+    def cerrar(self):
+        if self.libro is None:
+            return None
+        temporal = self.salida + ".tmp"
+        self.libro.save(temporal)
+        os.replace(temporal, self.salida)
+        return self.salida
+
+    def abortar(self):
+        self.libro = None
+
+
+ESCRITORES = {
+    "xlsx": EscritorExcel,
+    "csv": EscritorCSV,
+    "parquet": EscritorParquet,
+    "jsonl": EscritorJSONL,
+}
+
+
+class EscritorSalidas:
+    """Reparte cada fila entre varios escritores y acumula el tiempo de cada uno.
+
+    Cada fila se agrega además a un CSV parcial que se vacía a disco en el
+    momento; si el proceso se interrumpe, ese archivo conserva las filas ya
+    terminadas. Al cerrar correctamente se elimina.
+    """
+
+    def __init__(self, escritores, ruta_parcial):
+        self.escritores = escritores
+        self.ruta_parcial = ruta_parcial
+        self.tiempos = {escritor.formato: 0.0 for escritor in escritores}
+        self.filas = 0
+        self._archivo_parcial = None
+
+    def _abrir_parcial(self):
+        self._archivo_parcial = open(self.ruta_parcial, "w", newline="", encoding="utf-8-sig")
+        self._csv = csv.writer(self._archivo_parcial)
+        self._csv.writerow(COLUMNAS)
+
+    def escribir(self, fila, archivo=None):
+        if self._archivo_parcial is None:
+            self._abrir_parcial()
+        self._csv.writerow(fila.valores())
+        self._archivo_parcial.flush()
+        for escritor in self.escritores:
+            inicio = time.perf_counter()
+            escritor.escribir(fila, archivo)
+            self.tiempos[escritor.formato] += time.perf_counter() - inicio
+        self.filas += 1
+
+    def cerrar(self):
+        """Cerrar todos los escritores; devuelve las rutas generadas (vacía si no hubo filas)"""
+        rutas = []
+        for escritor in self.escritores:
+            inicio = time.perf_counter()
+            ruta = escritor.cerrar()
+            self.tiempos[escritor.formato] += time.perf_counter() - inicio
+            if ruta:
+                rutas.append(ruta)
+        if self._archivo_parcial is not None:
+            self._archivo_parcial.close()
+            os.remove(self.ruta_parcial)
+        return rutas
+
+    def abortar(self):
+        """Cerrar sin generar las salidas, conservando el CSV parcial"""
+        for escritor in self.escritores:
+            try:
+                escritor.abortar()
+            except Exception:
+                pass
+        if self._archivo_parcial is not None:
+            self._archivo_parcial.close()
+
+    def costos(self) -> list:
+        """Líneas con el costo de cada escritor para el registro de actividad"""
+        if self.filas == 0:
+            return []
+        detalle = ", ".join(
+            f"{formato} {segundos:.2f} s ({segundos / self.filas * 1000:.2f} ms/fila)"
+            for formato, segundos in self.tiempos.items()
+        )
+        return [f"🧾 Costo de escritura: {detalle}"]
+
+
+class OrdenadorFilas:
+    """Entrega al escritor las filas en el orden original aunque lleguen desordenadas.
+
+    Solo retiene las filas que llegan antes que alguna anterior todavía en
+    proceso; los archivos con error se registran con fila None para no
+    detener el avance.
+    """
+
+    def __init__(self, escribir):
+        self.escribir = escribir
+        self.siguiente = 0
+        self.pendientes = {}
+
+    def agregar(self, indice, fila, archivo=None):
+        self.pendientes[indice] = (fila, archivo)
+        while self.siguiente in self.pendientes:
+            fila, archivo = self.pendientes.pop(self.siguiente)
+            if fila is not None:
+                self.escribir(fila, archivo)
+            self.siguiente += 1
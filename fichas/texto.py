@@ -0,0 +1,108 @@
+"""Motores para leer la capa de texto de las fichas.
+
+pdfplumber (el motor por defecto) calcula la posición de cada carácter de la
+página antes de armar el texto; los campos que se buscan con expresiones
+regulares solo necesitan el texto. Los otros motores lo leen directamente:
+
+* pdfium (pypdfium2): la capa de texto que arma PDFium, sin objetos por
+  carácter en Python;
+* pdfminer: el análisis de diseño de pdfminer.six sin el paso de pdfplumber,
+  con LAParams que omiten el orden de lectura entre bloques.
+
+Con cualquiera de ellos pdfplumber sigue extrayendo las tablas (horario y
+días), pero solo analiza las páginas cuyo texto tiene alguna palabra clave
+de esas tablas. benchmarks/paridad_texto.py verifica que las columnas D..Z
+coincidan con las de pdfplumber en un corpus.
+"""
+import io
+
+MOTOR_POR_DEFECTO = "pdfplumber"
+
+
+class TextoPdfium:
+    """Texto de cada página con pypdfium2"""
+
+    nombre = "pdfium"
+
+    @staticmethod
+    def importar():
+        try:
+            import pypdfium2
+        except ImportError:
+            raise ImportError("El motor de texto pdfium requiere pypdfium2 (pip install pypdfium2)") from None
+        return pypdfium2
+
+    def __init__(self, fuente):
+        self.documento = self.importar().PdfDocument(fuente)
+
+    def texto_pagina(self, idx) -> str:
+        pagina = self.documento[idx]
+        try:
+            capa = pagina.get_textpage()
+            try:
+                # PDFium separa las líneas con \r\n
+                return capa.get_text_range().replace("\r\n", "\n")
+            finally:
+                capa.close()
+        finally:
+            pagina.close()
+
+    def cerrar(self):
+        self.documento.close()
+
+
+class TextoPdfminer:
+    """Texto de cada página con el análisis de diseño de pdfminer.six"""
+
+    nombre = "pdfminer"
+
+    @staticmethod
+    def importar():
+        # pdfminer.six es dependencia de pdfplumber
+        import pdfminer
+        return pdfminer
+
+    def __init__(self, fuente):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        self.archivo = io.BytesIO(fuente) if isinstance(fuente, bytes) else open(fuente, "rb")
+        try:
+            self.paginas = list(PDFPage.get_pages(self.archivo))
+        except Exception:
+            self.archivo.close()
+            raise
+        # boxes_flow=None: los bloques quedan de arriba abajo, sin calcular el orden de lectura
+        self.agregador = PDFPageAggregator(PDFResourceManager(), laparams=LAParams(boxes_flow=None))
+        self.interprete = PDFPageInterpreter(self.agregador.rsrcmgr, self.agregador)
+
+    def texto_pagina(self, idx) -> str:
+        from pdfminer.layout import LTTextContainer
+
+        self.interprete.process_page(self.paginas[idx])
+        diseno = self.agregador.get_result()
+        return "".join(elemento.get_text() for elemento in diseno if isinstance(elemento, LTTextContainer))
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+# Motores que no son pdfplumber, por nombre
+MOTORES_TEXTO = {motor.nombre: motor for motor in (TextoPdfium, TextoPdfminer)}
+NOMBRES_MOTORES = [MOTOR_POR_DEFECTO, *MOTORES_TEXTO]
+
+
+def verificar_motor_texto(nombre):
+    """Lanza ImportError (con el paquete a instalar) si el motor no está disponible"""
+    if nombre and nombre != MOTOR_POR_DEFECTO:
+        MOTORES_TEXTO[nombre].importar()
+
+
+def abrir_motor_texto(nombre, fuente):
+    """Motor de texto abierto sobre el PDF (ruta o bytes); None para pdfplumber
+    (el texto sale del mismo documento)"""
+    if not nombre or nombre == MOTOR_POR_DEFECTO:
+        return None
+    return MOTORES_TEXTO[nombre](fuente)
@@ -1,19 +1,37 @@
-import re
 import os
-import pdfplumber
-import pandas as pd
+import queue
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from tkinter import font as tkFont
 import threading
 from datetime import datetime
 
+from fichas.aislamiento import LIMITE_MEMORIA_MB, LIMITE_SEGUNDOS
+from fichas.descubrimiento import listar_pdfs
+from fichas.extraccion import precargar
+from fichas.lote import ejecutar_lote
+
+# Cada cuánto el hilo de la interfaz aplica los eventos del procesamiento
+INTERVALO_UI_MS = 100
+# Eventos aplicados como máximo por ciclo, para no congelar la ventana
+MAX_EVENTOS_POR_CICLO = 5000
+# Líneas que conserva el área de logs (se descartan las más antiguas)
+MAX_LINEAS_LOG = 2000
+
+
 class PDFExtractorGUI:
     def __init__(self, root):
         self.root = root
         self.carpeta_seleccionada = ""
+        self.procesando = False
+        # Los widgets solo se tocan desde el hilo de Tk: el resto de hilos
+        # publica eventos en esta cola y _drenar_eventos los aplica
+        self.eventos = queue.Queue()
         self.setup_window()
         self.create_widgets()
+        self.root.after(INTERVALO_UI_MS, self._drenar_eventos)
+        # pdfplumber tarda en importarse: se carga cuando la ventana ya está visible
+        self.root.after_idle(self._precargar_modulos)
         
     def setup_window(self):
         """Configurar la ventana principal"""
@@ -146,6 +164,84 @@ class PDFExtractorGUI:
         select_btn.bind("<Enter>", on_enter)
         select_btn.bind("<Leave>", on_leave)
         
+        # Número de procesos para el procesamiento en paralelo
+        options_frame = tk.Frame(folder_frame, bg=self.colors['surface'])
+        options_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        workers_label = tk.Label(
+            options_frame,
+            text="Procesos en paralelo:",
+            font=self.fonts['body'],
+            bg=self.colors['surface'],
+            fg=self.colors['text']
+        )
+        workers_label.pack(side=tk.LEFT)
+        
+        self.workers_var = tk.StringVar(value="1")
+        workers_spin = tk.Spinbox(
+            options_frame,
+            from_=1,
+            to=os.cpu_count() or 1,
+            textvariable=self.workers_var,
+            width=4,
+            font=self.fonts['body'],
+            relief=tk.FLAT
+        )
+        workers_spin.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Buscar PDFs también en las subcarpetas (una por centro)
+        self.recursivo_var = tk.BooleanVar(value=False)
+        recursivo_check = tk.Checkbutton(
+            options_frame,
+            text="Incluir subcarpetas",
+            variable=self.recursivo_var,
+            command=self.contar_pdfs,
+            font=self.fonts['body'],
+            bg=self.colors['surface'],
+            fg=self.colors['text'],
+            activebackground=self.colors['surface']
+        )
+        recursivo_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # Reutilizar resultados de ejecuciones anteriores
+        self.cache_var = tk.BooleanVar(value=True)
+        cache_check = tk.Checkbutton(
+            options_frame,
+            text="Omitir archivos sin cambios (caché)",
+            variable=self.cache_var,
+            font=self.fonts['body'],
+            bg=self.colors['surface'],
+            fg=self.colors['text'],
+            activebackground=self.colors['surface']
+        )
+        cache_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # Informe de tiempos por etapa junto al Excel
+        self.perfil_var = tk.BooleanVar(value=False)
+        perfil_check = tk.Checkbutton(
+            options_frame,
+            text="Medir tiempos por etapa",
+            variable=self.perfil_var,
+            font=self.fonts['body'],
+            bg=self.colors['surface'],
+            fg=self.colors['text'],
+            activebackground=self.colors['surface']
+        )
+        perfil_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # Procesar cada archivo en su propio proceso con límite de tiempo y memoria
+        self.aislar_var = tk.BooleanVar(value=False)
+        aislar_check = tk.Checkbutton(
+            options_frame,
+            text=f"Aislar archivos problemáticos ({LIMITE_SEGUNDOS} s / {LIMITE_MEMORIA_MB} MB)",
+            variable=self.aislar_var,
+            font=self.fonts['body'],
+            bg=self.colors['surface'],
+            fg=self.colors['text'],
+            activebackground=self.colors['surface']
+        )
+        aislar_check.pack(side=tk.LEFT, padx=(20, 0))
+        
     def create_progress_section(self, parent):
         """Crear la sección de progreso"""
         progress_frame = tk.LabelFrame(
@@ -297,15 +393,55 @@ class PDFExtractorGUI:
         create_hover_effect(exit_btn, self.colors['secondary'], '#822653')
         
     def add_log(self, mensaje):
-        """Agregar mensaje al área de logs"""
+        """Agregar mensaje al área de logs (seguro desde cualquier hilo)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] {mensaje}\n"
+        self.eventos.put(("log", f"[{timestamp}] {mensaje}\n"))
+        
+    def en_hilo_ui(self, funcion, *args):
+        """Ejecutar una función en el hilo de Tk tras los eventos ya publicados"""
+        self.eventos.put(("llamar", funcion, args))
+        
+    def _drenar_eventos(self):
+        """Aplicar en bloque los eventos pendientes: las líneas de log se insertan
+        de una vez y de los avances de progreso solo cuenta el último"""
+        lineas = []
+        progreso = None
+        llamadas = []
+        try:
+            for _ in range(MAX_EVENTOS_POR_CICLO):
+                evento = self.eventos.get_nowait()
+                if evento[0] == "log":
+                    lineas.append(evento[1])
+                elif evento[0] == "progreso":
+                    progreso = evento[1:]
+                else:
+                    llamadas.append(evento[1:])
+        except queue.Empty:
+            pass
+        
+        try:
+            if lineas:
+                self._insertar_logs("".join(lineas))
+            if progreso:
+                completados, total, archivo = progreso
+                self.progress['maximum'] = total
+                self.progress['value'] = completados
+                if archivo:
+                    self.status_var.set(f"Procesando: {completados}/{total} ({archivo})")
+            for funcion, args in llamadas:
+                funcion(*args)
+        finally:
+            self.root.after(INTERVALO_UI_MS, self._drenar_eventos)
         
+    def _insertar_logs(self, texto):
         self.logs_text.configure(state=tk.NORMAL)
-        self.logs_text.insert(tk.END, log_message)
+        self.logs_text.insert(tk.END, texto)
+        # Limitar el tamaño del área de logs en lotes muy grandes
+        lineas = int(self.logs_text.index('end-1c').split('.')[0]) - 1
+        if lineas > MAX_LINEAS_LOG:
+            self.logs_text.delete('1.0', f'{lineas - MAX_LINEAS_LOG + 1}.0')
         self.logs_text.configure(state=tk.DISABLED)
         self.logs_text.see(tk.END)
-        self.root.update_idletasks()
         
     def limpiar_logs(self):
         """Limpiar el área de logs"""
@@ -320,19 +456,31 @@ class PDFExtractorGUI:
         if carpeta:
             self.carpeta_seleccionada = carpeta
             self.path_var.set(carpeta)
+            self.contar_pdfs()
             
-            # Contar PDFs en la carpeta
-            pdf_count = len([f for f in os.listdir(carpeta) if f.lower().endswith('.pdf')])
-            
-            if pdf_count > 0:
-                self.add_log(f"📁 Carpeta seleccionada: {os.path.basename(carpeta)}")
-                self.add_log(f"📄 Se encontraron {pdf_count} archivos PDF")
-                self.process_btn.configure(state=tk.NORMAL)
-                self.status_var.set(f"Listo para procesar {pdf_count} archivos PDF")
-            else:
-                self.add_log("⚠️ No se encontraron archivos PDF en la carpeta seleccionada")
-                self.process_btn.configure(state=tk.DISABLED)
-                self.status_var.set("No hay archivos PDF para procesar")
+    def contar_pdfs(self):
+        """Contar los PDFs de la carpeta seleccionada (y de sus subcarpetas si se incluyen)"""
+        carpeta = self.carpeta_seleccionada
+        if not carpeta or self.procesando:
+            return
+        pdf_count = len(listar_pdfs(carpeta, self.recursivo_var.get()))
+        
+        if pdf_count > 0:
+            self.add_log(f"📁 Carpeta seleccionada: {os.path.basename(carpeta)}")
+            self.add_log(f"📄 Se encontraron {pdf_count} archivos PDF")
+            self.process_btn.configure(state=tk.NORMAL)
+            self.status_var.set(f"Listo para procesar {pdf_count} archivos PDF")
+        else:
+            self.add_log("⚠️ No se encontraron archivos PDF en la carpeta seleccionada")
+            self.process_btn.configure(state=tk.DISABLED)
+            self.status_var.set("No hay archivos PDF para procesar")
+        
+    def leer_workers(self):
+        """Leer el número de procesos configurado (1 = secuencial)"""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except ValueError:
+            return 1
         
     def procesar_pdfs(self):
         """Procesar todos los PDFs en un hilo separado"""
@@ -341,280 +489,97 @@ class PDFExtractorGUI:
             return
             
         # Deshabilitar botón durante el procesamiento
+        self.procesando = True
         self.process_btn.configure(state=tk.DISABLED)
         
         # Ejecutar en hilo separado para no bloquear la UI
-        thread = threading.Thread(target=self._procesar_pdfs_thread)
+        workers = self.leer_workers()
+        usar_cache = self.cache_var.get()
+        perfilar = self.perfil_var.get()
+        aislar = self.aislar_var.get()
+        recursivo = self.recursivo_var.get()
+        thread = threading.Thread(
+            target=self._procesar_pdfs_thread,
+            args=(workers, usar_cache, perfilar, aislar, recursivo)
+        )
         thread.daemon = True
         thread.start()
         
-    def _procesar_pdfs_thread(self):
+    def _precargar_modulos(self):
+        """Importar pdfplumber en un hilo mientras el usuario elige la carpeta"""
+        thread = threading.Thread(target=self._precargar_modulos_thread, daemon=True)
+        thread.start()
+
+    def _precargar_modulos_thread(self):
+        try:
+            precargar()
+        except Exception:
+            # Si falta una dependencia, el error se informa al procesar
+            pass
+
+    def _actualizar_progreso(self, completados, total, archivo):
+        """Publicar el avance del lote (se llama desde el hilo de procesamiento)"""
+        self.eventos.put(("progreso", completados, total, archivo))
+        
+    def _procesar_pdfs_thread(self, workers=1, usar_cache=True, perfilar=False, aislar=False,
+                              recursivo=False):
         """Hilo para procesar PDFs sin bloquear la interfaz"""
         try:
-            archivos_pdf = [f for f in os.listdir(self.carpeta_seleccionada) if f.lower().endswith('.pdf')]
-            total_archivos = len(archivos_pdf)
+            resumen = ejecutar_lote(
+                self.carpeta_seleccionada,
+                workers=workers,
+                usar_cache=usar_cache,
+                recursivo=recursivo,
+                perfilar=perfilar,
+                limite_segundos=LIMITE_SEGUNDOS if aislar else None,
+                limite_memoria_mb=LIMITE_MEMORIA_MB if aislar else None,
+                log=self.add_log,
+                progreso=self._actualizar_progreso
+            )
             
-            if total_archivos == 0:
-                self.add_log("❌ No se encontraron archivos PDF")
+            if resumen.total == 0:
                 return
-                
-            self.add_log(f"🔄 Iniciando procesamiento de {total_archivos} archivos...")
-            self.progress['maximum'] = total_archivos
-            
-            datos = []
-            archivos_procesados = 0
-            archivos_con_error = 0
-            
-            for i, archivo in enumerate(archivos_pdf):
-                try:
-                    ruta_pdf = os.path.join(self.carpeta_seleccionada, archivo)
-                    self.status_var.set(f"Procesando: {archivo}")
-                    self.add_log(f"📄 Procesando: {archivo}")
-                    
-                    # Procesar PDF
-                    fila = self.procesar_pdf(ruta_pdf)
-                    datos.append(fila)
-                    archivos_procesados += 1
-                    
-                    self.add_log(f"✅ {archivo} procesado correctamente")
-                    
-                except Exception as e:
-                    archivos_con_error += 1
-                    self.add_log(f"❌ Error procesando {archivo}: {str(e)}")
-                
-                # Actualizar progreso
-                self.progress['value'] = i + 1
-                self.root.update_idletasks()
-            
-            # Guardar resultados
-            if datos:
-                df = pd.DataFrame(datos)
-                salida = os.path.join(self.carpeta_seleccionada, "resultado_total.xlsx")
-                df.to_excel(salida, index=False)
-                
-                self.add_log(f"💾 Archivo Excel guardado: {os.path.basename(salida)}")
-                self.add_log(f"📊 Resumen: {archivos_procesados} exitosos, {archivos_con_error} con errores")
-                self.status_var.set(f"Completado: {archivos_procesados}/{total_archivos} archivos procesados")
-                
-                messagebox.showinfo(
+            if resumen.salida:
+                self.en_hilo_ui(
+                    self.status_var.set,
+                    f"Completado: {resumen.procesados}/{resumen.total} archivos procesados"
+                )
+                detalle_cache = (
+                    f"Caché: {resumen.aciertos_cache} sin cambios, {resumen.fallos_cache} nuevos o modificados\n"
+                    if usar_cache else ""
+                )
+                detalle_repetidos = (
+                    f"Archivos idénticos (procesados una sola vez): {resumen.repetidos}\n"
+                    if resumen.repetidos else ""
+                )
+                detalle_cuarentena = (
+                    f"En cuarentena (omitidos): {resumen.en_cuarentena}\n"
+                    if resumen.en_cuarentena else ""
+                )
+                self.en_hilo_ui(
+                    messagebox.showinfo,
                     "Procesamiento Completado",
-                    f"Se procesaron {archivos_procesados} archivos correctamente.\n"
-                    f"Archivo guardado en: {salida}"
+                    f"Se procesaron {resumen.procesados} archivos correctamente.\n"
+                    f"{detalle_cache}"
+                    f"{detalle_repetidos}"
+                    f"{detalle_cuarentena}"
+                    f"Archivo guardado en: {resumen.salida}"
                 )
             else:
-                self.add_log("❌ No se pudo procesar ningún archivo")
-                messagebox.showerror("Error", "No se pudo procesar ningún archivo PDF")
+                self.en_hilo_ui(messagebox.showerror, "Error", "No se pudo procesar ningún archivo PDF")
                 
         except Exception as e:
             self.add_log(f"❌ Error general: {str(e)}")
-            messagebox.showerror("Error", f"Error durante el procesamiento: {str(e)}")
+            self.en_hilo_ui(messagebox.showerror, "Error", f"Error durante el procesamiento: {str(e)}")
         
         finally:
-            # Rehabilitar botón
-            self.process_btn.configure(state=tk.NORMAL)
-            self.progress['value'] = 0
-
-    # =========================
-    # Funciones de procesamiento PDF (copiadas del código original)
-    # =========================
-    def formatear_cedula(self, raw: str) -> str:
-        if not raw:
-            return ""
-        digits = re.sub(r"[^0-9]", "", raw)
-        if not digits:
-            return ""
-        try:
-            return f"{int(digits):,}".replace(",", ".")
-        except Exception:
-            return digits
-
-    def formatear_fecha(self, dia: str, mes: str, anio: str) -> str:
-        return f"{int(dia)}/{int(mes)}/20{int(anio)}"
-
-    def safe_extract_text(self, pdf) -> str:
-        pages_text = []
-        for page in pdf.pages:
-            t = page.extract_text()
-            pages_text.append(t or "")
-        return "\n".join(pages_text)
-
-    def extraer_horario_maximo(self, pdf) -> str:
-        horarios_encontrados = []
-        for p_idx, page in enumerate(pdf.pages):
-            tables = page.extract_tables()
-            if not tables:
-                continue
-            for t_idx, table in enumerate(tables):
-                if not table:
-                    continue
-                for row_idx, row in enumerate(table):
-                    if not row:
-                        continue
-                    clean_row = [str(cell or "").strip() for cell in row]
-                    desde_idx = hasta_idx = None
-                    for col_idx, cell in enumerate(clean_row):
-                        if "DESDE" in cell.upper():
-                            desde_idx = col_idx
-                        if "HASTA" in cell.upper():
-                            hasta_idx = col_idx
-                    if desde_idx is not None and hasta_idx is not None:
-                        for data_idx in range(row_idx + 1, len(table)):
-                            data_row = table[data_idx]
-                            if not data_row or len(data_row) <= max(desde_idx, hasta_idx):
-                                continue
-                            desde_val = str(data_row[desde_idx] or "").strip()
-                            hasta_val = str(data_row[hasta_idx] or "").strip()
-                            desde_match = re.search(r'(\d{1,2})', desde_val)
-                            hasta_match = re.search(r'(\d{1,2})', hasta_val)
-                            if desde_match and hasta_match:
-                                desde_hora = int(desde_match.group(1))
-                                hasta_hora = int(hasta_match.group(1))
-                                rango = hasta_hora - desde_hora
-                                horarios_encontrados.append({
-                                    'desde': desde_hora,
-                                    'hasta': hasta_hora,
-                                    'rango': rango,
-                                    'formato': f"{desde_hora} A {hasta_hora}"
-                                })
-                    if "HORARIO" in " ".join(clean_row).upper():
-                        numeros = []
-                        for cell in clean_row:
-                            match = re.search(r'(\d{1,2})', cell)
-                            if match:
-                                numeros.append(int(match.group(1)))
-                        if len(numeros) >= 2:
-                            desde_hora = numeros[0]
-                            hasta_hora = numeros[1]
-                            rango = hasta_hora - desde_hora
-                            horarios_encontrados.append({
-                                'desde': desde_hora,
-                                'hasta': hasta_hora,
-                                'rango': rango,
-                                'formato': f"{desde_hora} A {hasta_hora}"
-                            })
-        if horarios_encontrados:
-            horario_maximo = max(horarios_encontrados, key=lambda x: x['rango'])
-            return horario_maximo['formato']
-        return ""
-
-    def procesar_pdf(self, pdf_path):
-        with pdfplumber.open(pdf_path) as pdf:
-            texto = self.safe_extract_text(pdf)
-            horario = self.extraer_horario_maximo(pdf)
-
-        # Código programa
-        codigo_programa = ""
-        m = re.search(r"c[oó]digo(?:\s+del)?(?:\s+Programa)?(?:\s+o\s+EDT)?[\s:]*([0-9]{4,})", texto, re.I)
-        if m:
-            codigo_programa = m.group(1)
-
-        # Programa especial / Convenio
-        programas_especiales_val = ""
-        convenio_val = ""
-        m = re.search(r"Programas especiales\s*[:\-]?\s*([^\n\r]*)", texto, re.I)
-        if m:
-            val = m.group(1).strip()
-            if val and val.lower() not in ["programas especiales", "programas especiales:"]:
-                programas_especiales_val = val
-        m = re.search(r"Convenio\s*[:\-]?\s*([^\n\r]*)", texto, re.I)
-        if m:
-            val = m.group(1).strip()
-            if val and val.lower() not in ["convenio", "convenio:"]:
-                convenio_val = val
-        if (not programas_especiales_val and not convenio_val) or \
-        ((programas_especiales_val.lower() == "no aplica" if programas_especiales_val else True) and
-            (convenio_val.lower() == "no aplica" if convenio_val else True)):
-            programa_especial = "NINGUNA"
-        elif programas_especiales_val and programas_especiales_val.lower() != "no aplica":
-            programa_especial = programas_especiales_val
-        elif convenio_val and convenio_val.lower() != "no aplica":
-            programa_especial = convenio_val
-        else:
-            programa_especial = "NINGUNA"
-
-        # Cédula
-        cedula = ""
-        m = re.search(r"cedul[ao]\s*[:\-]?\s*([0-9\.,]+)", texto, re.I)
-        if m:
-            cedula = self.formatear_cedula(m.group(1))
-        else:
-            m2 = re.search(r"Instructor[\s\S]{0,80}?([0-9]{6,12})", texto, re.I)
-            if m2:
-                cedula = self.formatear_cedula(m2.group(1))
-
-        # Fechas
-        fecha_inicio_fmt = ""
-        fecha_final_fmt = ""
-        m = re.search(r"De inicio\s+(\d{1,2})\s+(\d{1,2})\s+(\d{2})", texto, re.I)
-        if m:
-            fecha_inicio_fmt = self.formatear_fecha(m.group(1), m.group(2), m.group(3))
-        m = re.search(r"De finalizaci[oó]n\s+(\d{1,2})\s+(\d{1,2})\s+(\d{2})", texto, re.I)
-        if m:
-            fecha_final_fmt = self.formatear_fecha(m.group(1), m.group(2), m.group(3))
-
-        # Municipio
-        municipio = ""
-        m = re.search(r"MUNICIPIO\s*[:\-]?\s*(.*)", texto, re.I)
-        if m:
-            municipio = m.group(1).strip()
-
-        # Lugar + Vereda
-        m_lugar = re.search(r"LUGAR DONDE SE DICTA\s*[:\-]?\s*(.*)", texto, re.I)
-        m_vereda = re.search(r"VEREDA\s*[:\-]?\s*(.*)", texto, re.I)
-        lugar_val = m_lugar.group(1).strip() if m_lugar and m_lugar.group(1).strip() else ""
-        vereda_val = m_vereda.group(1).strip() if m_vereda and m_vereda.group(1).strip() else ""
-        if lugar_val and vereda_val:
-            if lugar_val.lower() == vereda_val.lower():
-                lugar_completo = lugar_val
-            else:
-                lugar_completo = f"{lugar_val} - {vereda_val}"
-        elif lugar_val:
-            lugar_completo = lugar_val
-        elif vereda_val:
-            lugar_completo = vereda_val
-        else:
-            lugar_completo = ""
-
-        # Días de la semana
-        dias_semana = {col: "" for col in ["S", "T", "U", "V", "W", "X", "Y"]}
-        dias_mapping = {"LU": "S", "MA": "T", "MI": "U", "JU": "V", "VI": "W", "SA": "X", "DO": "Y"}
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                if not tables:
-                    continue
-                for table in tables:
-                    if not table:
-                        continue
-                    header = [str(cell or "").strip().upper() for cell in table[0]]
-                    if set(dias_mapping.keys()).issubset(header):
-                        col_indices = {dia: header.index(dia) for dia in dias_mapping}
-                        for row in table[1:]:
-                            for dia, col_letter in dias_mapping.items():
-                                idx = col_indices[dia]
-                                cell_val = str(row[idx] or "").strip()
-                                if cell_val.isdigit():
-                                    dias_semana[col_letter] = "X"
-
-        # Cupo
-        cupo = ""
-        m = re.search(r"Cupo\s*[:\-]?\s*(\d+)", texto, re.I)
-        if m:
-            cupo = int(m.group(1))
-
-        # Diccionario final
-        return {
-            "D": codigo_programa,
-            "H": programa_especial,
-            "I": cedula,
-            "N": fecha_inicio_fmt,
-            "O": fecha_final_fmt,
-            "P": municipio,
-            "Q": lugar_completo,
-            "R": horario,
-            **dias_semana,
-            "Z": cupo
-        }
+            self.en_hilo_ui(self._finalizar_procesamiento)
+            
+    def _finalizar_procesamiento(self):
+        """Rehabilitar el botón y reiniciar la barra al terminar el lote"""
+        self.procesando = False
+        self.process_btn.configure(state=tk.NORMAL)
+        self.progress['value'] = 0
 
 def main():
     root = tk.Tk()